@@ -1,4 +1,5 @@
 import streamlit as st
+from assets import show_image
 
 def about_page():
     # Header
@@ -33,7 +34,7 @@ def about_page():
     """)
 
     # Display the image
-    st.image("ML_flowchart.png", caption="Model Flowchart", use_column_width=True)
+    show_image(st, "ML_flowchart.png", caption="Model Flowchart")
 
     # Stay Updated
     st.markdown("<h2 style='color: #2ca02c;'>📩 Stay Updated</h2>", unsafe_allow_html=True)
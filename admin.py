@@ -0,0 +1,46 @@
+import pandas as pd
+import streamlit as st
+
+from perf import perf_recorder
+
+
+def admin_page():
+    import altair as alt
+
+    st.header("⏱️ Performance")
+    st.write("Rolling latency of each instrumented stage, across all sessions of this server process.")
+
+    left, middle, right = st.columns(3)
+    perf_recorder.profiling = left.toggle("cProfile page renders", value=perf_recorder.profiling, key="perf_profiling")
+    tracing = middle.toggle("Track allocations (tracemalloc)", value=perf_recorder.tracing, key="perf_tracemalloc",
+                            help="Slows every allocation; best with a single session.")
+    if tracing != perf_recorder.tracing:
+        perf_recorder.set_tracemalloc(tracing)
+    if right.button("Reset samples"):
+        perf_recorder.clear()
+
+    stats = perf_recorder.stats()
+    if not stats:
+        st.info("No samples yet. Open the other pages to record some.")
+        return
+
+    st.dataframe(pd.DataFrame.from_dict(stats, orient="index"), width="stretch")
+    st.download_button("Download JSON", perf_recorder.to_json(indent=2), file_name="heart_perf.json",
+                       mime="application/json")
+
+    names = list(stats)
+    selected = st.multiselect("Latency histograms", names, default=[n for n in names if n.startswith("page/")][:3])
+    if selected:
+        samples = pd.DataFrame([(name, seconds * 1000) for name in selected for seconds in perf_recorder.samples(name)],
+                               columns=["Span", "ms"])
+        chart = alt.Chart(samples).mark_bar().encode(
+            x=alt.X("ms", type="quantitative", bin=alt.Bin(maxbins=40), title="Latency (ms)"),
+            y=alt.Y("count()", title="Samples"),
+            color="Span",
+            row=alt.Row("Span", title=None),
+        ).properties(height=120).resolve_scale(x="independent")
+        st.altair_chart(chart)
+
+    for profile in reversed(perf_recorder.profiles()):
+        with st.expander(f"cProfile: {profile['span']} at {profile['at']} ({profile['seconds'] * 1000:.0f} ms)"):
+            st.code(profile["stats"], language=None)
@@ -2,36 +2,61 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+import hist_cube
+from dataset_view import as_view, show_rows
+from figure_cache import dataset_fingerprint, set_theme, show_figure
+from perf import span
+from query_backend import PandasBackend, draw_counts
+from stats_engine import StreamingStats
+
+def analyze_page(df, stats=None, query=None):
+    # Work on a read-only view of the shared dataset; column partitions are computed once per dataset
+    view = as_view(df)
+    df = view.frame
 
-def analyze_page(df):
     st.header("🎨 Advanced Data Analysis")
     st.write("Explore and analyze your dataset with colorful and interactive visualizations.")
 
-    # Set a colorful seaborn theme
-    sns.set_theme(style="whitegrid", context="talk", palette="colorblind")
+    # Summary statistics come from a precomputed single-pass engine when the app provides one
+    if stats is None:
+        stats = StreamingStats.from_frame(df)
+    # Explorer and count plot aggregations; the app passes the shared (possibly on-disk) backend
+    if query is None:
+        query = PandasBackend(df)
+
+    # Rendered figures are cached per dataset, so unchanged plots skip matplotlib on reruns
+    fingerprint = dataset_fingerprint(df)
+
+    # Colorful seaborn theme for this page's figures
+    set_theme(style="whitegrid", context="talk", palette="colorblind")
 
     # Data Summary
     st.subheader("📊 Data Summary")
     st.write("Get an overview of the dataset's basic statistics.")
-    st.write(df.describe())
+    with span("analyze/describe"):
+        summary = stats.describe()
+    st.write(summary)
 
     # Option to display full summary statistics or specific statistics
     if st.checkbox("Show more summary statistics"):
-        st.write(df.describe(include='all'))
+        st.write(stats.describe_all())
 
     # Missing Data Visualization
     st.subheader("🔍 Missing Data Analysis")
-    missing_data = df.isnull().sum()
+    missing_data = stats.null_counts()
     st.write("Number of missing values in each column:")
     st.write(missing_data)
 
     if missing_data.sum() > 0:
-        fig, ax = plt.subplots(figsize=(14, 8))
-        sns.heatmap(df.isnull(), cbar=False, cmap='magma', ax=ax, linewidths=0.5)
-        ax.set_title('Missing Data Heatmap', fontsize=18, fontweight='bold', color='darkviolet')
-        ax.set_xlabel('Columns', fontsize=14, color='darkorange')
-        ax.set_ylabel('Rows', fontsize=14, color='darkorange')
-        st.pyplot(fig)
+        def draw_missing_heatmap():
+            fig, ax = plt.subplots(figsize=(14, 8))
+            sns.heatmap(df.isnull(), cbar=False, cmap='magma', ax=ax, linewidths=0.5)
+            ax.set_title('Missing Data Heatmap', fontsize=18, fontweight='bold', color='darkviolet')
+            ax.set_xlabel('Columns', fontsize=14, color='darkorange')
+            ax.set_ylabel('Rows', fontsize=14, color='darkorange')
+            return fig
+
+        show_figure(("analyze", "missing_heatmap", fingerprint), draw_missing_heatmap)
     else:
         st.write("No missing data in the dataset.")
 
@@ -45,15 +70,18 @@ def analyze_page(df):
     st.write("Explore correlations between numeric variables.")
     
     # Filter numeric columns
-    numeric_df = df.select_dtypes(include=['number'])
+    numeric_df = view.numeric
     
     if not numeric_df.empty:
-        corr = numeric_df.corr()
+        def draw_correlation_heatmap():
+            corr = stats.corr().loc[numeric_df.columns, numeric_df.columns]
 
-        fig, ax = plt.subplots(figsize=(16, 12))
-        sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', ax=ax, linewidths=1, linecolor='white')
-        ax.set_title('Correlation Heatmap', fontsize=18, fontweight='bold', color='crimson')
-        st.pyplot(fig)
+            fig, ax = plt.subplots(figsize=(16, 12))
+            sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', ax=ax, linewidths=1, linecolor='white')
+            ax.set_title('Correlation Heatmap', fontsize=18, fontweight='bold', color='crimson')
+            return fig
+
+        show_figure(("analyze", "correlation_heatmap", fingerprint), draw_correlation_heatmap)
     else:
         st.write("No numeric columns available for correlation analysis.")
 
@@ -65,24 +93,28 @@ def analyze_page(df):
     
     if selected_columns:
         st.write("Summary Statistics:")
-        st.write(df[selected_columns].describe())
+        st.write(query.describe(selected_columns))
         st.write("Data Types:")
         st.write(df[selected_columns].dtypes)
         
         for col in selected_columns:
             st.write(f"Unique values in {col}:")
-            st.write(df[col].unique())
+            st.write(query.unique(col))
             
             if pd.api.types.is_numeric_dtype(df[col]):
                 st.write(f"Distribution of {col}:")
                 bins = st.slider(f"Select number of bins for {col}", min_value=10, max_value=100, value=30)
                 kde = st.checkbox(f"Add KDE for {col}", value=True)
-                fig, ax = plt.subplots(figsize=(12, 8))
-                sns.histplot(df[col], bins=bins, kde=kde, color='teal', edgecolor='black', ax=ax)
-                ax.set_title(f'Distribution of {col}', fontsize=18, fontweight='bold', color='royalblue')
-                ax.set_xlabel(f'{col}', fontsize=14)
-                ax.set_ylabel('Frequency', fontsize=14)
-                st.pyplot(fig)
+
+                def draw_column_histogram(col=col, bins=bins, kde=kde):
+                    fig, ax = plt.subplots(figsize=(12, 8))
+                    hist_cube.draw_histogram(ax, view.histogram(col), bins, kde=kde, color='teal', edgecolor='black')
+                    ax.set_title(f'Distribution of {col}', fontsize=18, fontweight='bold', color='royalblue')
+                    ax.set_xlabel(f'{col}', fontsize=14)
+                    ax.set_ylabel('Frequency', fontsize=14)
+                    return fig
+
+                show_figure(("analyze", "column_histogram", col, bins, kde, fingerprint), draw_column_histogram)
 
     # Distribution of Numeric Columns (Overall)
     st.subheader("📈 Distribution of Numeric Columns")
@@ -92,12 +124,16 @@ def analyze_page(df):
     if dist_column:
         bins = st.slider(f"Select number of bins for {dist_column}", min_value=10, max_value=100, value=30)
         kde = st.checkbox(f"Add KDE for {dist_column}", value=True)
-        fig, ax = plt.subplots(figsize=(12, 8))
-        sns.histplot(df[dist_column], bins=bins, kde=kde, color='mediumseagreen', edgecolor='black', ax=ax)
-        ax.set_title(f'Distribution of {dist_column}', fontsize=18, fontweight='bold', color='royalblue')
-        ax.set_xlabel(f'{dist_column}', fontsize=14)
-        ax.set_ylabel('Frequency', fontsize=14)
-        st.pyplot(fig)
+
+        def draw_distribution():
+            fig, ax = plt.subplots(figsize=(12, 8))
+            hist_cube.draw_histogram(ax, view.histogram(dist_column), bins, kde=kde, color='mediumseagreen', edgecolor='black')
+            ax.set_title(f'Distribution of {dist_column}', fontsize=18, fontweight='bold', color='royalblue')
+            ax.set_xlabel(f'{dist_column}', fontsize=14)
+            ax.set_ylabel('Frequency', fontsize=14)
+            return fig
+
+        show_figure(("analyze", "distribution", dist_column, bins, kde, fingerprint), draw_distribution)
 
     # Additional Analysis Plots
 
@@ -105,60 +141,73 @@ def analyze_page(df):
     st.subheader("📦 Box Plot")
     box_column = st.selectbox("Select a numeric column for Box Plot", numeric_columns)
     if box_column:
-        fig, ax = plt.subplots(figsize=(12, 8))
-        sns.boxplot(x=df[box_column], color='salmon', ax=ax)
-        ax.set_title(f'Box Plot of {box_column}', fontsize=18, fontweight='bold', color='firebrick')
-        ax.set_xlabel(f'{box_column}', fontsize=14)
-        ax.set_ylabel('Values', fontsize=14)
-        st.pyplot(fig)
+        def draw_boxplot():
+            fig, ax = plt.subplots(figsize=(12, 8))
+            sns.boxplot(x=df[box_column], color='salmon', ax=ax)
+            ax.set_title(f'Box Plot of {box_column}', fontsize=18, fontweight='bold', color='firebrick')
+            ax.set_xlabel(f'{box_column}', fontsize=14)
+            ax.set_ylabel('Values', fontsize=14)
+            return fig
+
+        show_figure(("analyze", "boxplot", box_column, fingerprint), draw_boxplot)
 
     # Violin Plot
     st.subheader("🎻 Violin Plot")
     violin_column = st.selectbox("Select a numeric column for Violin Plot", numeric_columns)
     if violin_column:
-        fig, ax = plt.subplots(figsize=(12, 8))
-        sns.violinplot(x=df[violin_column], color='skyblue', ax=ax)
-        ax.set_title(f'Violin Plot of {violin_column}', fontsize=18, fontweight='bold', color='cornflowerblue')
-        ax.set_xlabel(f'{violin_column}', fontsize=14)
-        ax.set_ylabel('Density', fontsize=14)
-        st.pyplot(fig)
+        def draw_violinplot():
+            fig, ax = plt.subplots(figsize=(12, 8))
+            sns.violinplot(x=df[violin_column], color='skyblue', ax=ax)
+            ax.set_title(f'Violin Plot of {violin_column}', fontsize=18, fontweight='bold', color='cornflowerblue')
+            ax.set_xlabel(f'{violin_column}', fontsize=14)
+            ax.set_ylabel('Density', fontsize=14)
+            return fig
+
+        show_figure(("analyze", "violinplot", violin_column, fingerprint), draw_violinplot)
 
     # Count Plot
     st.subheader("📊 Count Plot")
-    categorical_columns = df.select_dtypes(include=['object']).columns
+    categorical_columns = list(view.categorical_columns)
     count_column = st.selectbox("Select a categorical column for Count Plot", categorical_columns)
     if count_column:
-        fig, ax = plt.subplots(figsize=(12, 8))
-        sns.countplot(x=df[count_column], palette='pastel', ax=ax)
-        ax.set_title(f'Count Plot of {count_column}', fontsize=18, fontweight='bold', color='brown')
-        ax.set_xlabel(f'{count_column}', fontsize=14)
-        ax.set_ylabel('Count', fontsize=14)
-        st.pyplot(fig)
+        def draw_countplot():
+            fig, ax = plt.subplots(figsize=(12, 8))
+            draw_counts(ax, query.value_counts(count_column, sort=False), palette='pastel')
+            ax.set_title(f'Count Plot of {count_column}', fontsize=18, fontweight='bold', color='brown')
+            ax.set_xlabel(f'{count_column}', fontsize=14)
+            ax.set_ylabel('Count', fontsize=14)
+            return fig
+
+        show_figure(("analyze", "countplot", count_column, fingerprint), draw_countplot)
 
     # Bar Plot
     st.subheader("📊 Bar Plot")
     bar_column = st.selectbox("Select a categorical column for Bar Plot", categorical_columns)
     if bar_column:
-        bar_data = df[bar_column].value_counts()
-        fig, ax = plt.subplots(figsize=(14, 10))
-        sns.barplot(x=bar_data.index, y=bar_data.values, palette='viridis', ax=ax)
-        ax.set_title(f'Bar Plot of {bar_column}', fontsize=18, fontweight='bold', color='darkviolet')
-        ax.set_xlabel(f'{bar_column}', fontsize=14)
-        ax.set_ylabel('Count', fontsize=14)
-        st.pyplot(fig)
+        def draw_barplot():
+            bar_data = query.value_counts(bar_column)
+            fig, ax = plt.subplots(figsize=(14, 10))
+            sns.barplot(x=bar_data.index, y=bar_data.values, palette='viridis', ax=ax)
+            ax.set_title(f'Bar Plot of {bar_column}', fontsize=18, fontweight='bold', color='darkviolet')
+            ax.set_xlabel(f'{bar_column}', fontsize=14)
+            ax.set_ylabel('Count', fontsize=14)
+            return fig
+
+        show_figure(("analyze", "barplot", bar_column, fingerprint), draw_barplot)
 
     # Custom Interactive Widgets
     st.sidebar.header("🛩️ Advanced Filters")
+    if st.sidebar.button("Reset Filters"):
+        st.session_state.pop("analyze_age_range", None)
     min_value, max_value = st.sidebar.slider(
         "Select the range of Age",
         min_value=10,
         max_value=100,
-        value=(10,100)
+        value=(10,100),
+        key="analyze_age_range"
     )
 
-    filtered_df = df[(df[numeric_columns[0]] >= min_value) & (df[numeric_columns[0]] <= max_value)]
+    # Resolved through the sorted Age index; only the visible page of rows is built
+    filtered_rows = view.rows({'Age': (min_value, max_value)})
     st.write(f"Filtered dataset based on the selected range: {min_value} - {max_value}")
-    st.write(filtered_df)
-
-    if st.sidebar.button("Reset Filters"):
-        st.experimental_rerun()
+    show_rows(st, view, filtered_rows, key="analyze_filter_page")
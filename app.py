@@ -1,10 +1,18 @@
+import sys
+import time
 import streamlit as st
 import pandas as pd
-import joblib
-from visualize import visualize_page
-from analyze import analyze_page
-from insights import insights_page
-from about import about_page
+from resources import (
+    DATA_PATH, MODEL_PATH, POSITIVE_CLASS, load_explainer, load_predictor, load_query, load_stats, load_view, resource_fingerprint,
+    resource_stats,
+)
+from assets import SIDEBAR_SIZES, SIDEBAR_WIDTH, show_image
+from perf import admin_allowed, perf_recorder, span
+from prefetch import prefetcher
+from prediction_cache import canonical_key, prediction_cache
+
+# Whole-rerun latency, recorded per page at the end of the script
+rerun_start = time.perf_counter()
 
 # Set custom Streamlit theme
 st.set_page_config(
@@ -14,11 +22,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load the dataset
-df = pd.read_csv("Heart_Disease_Prediction.csv")
-
-# Load the trained model
-model = joblib.load("RF_heart_disease_model.pkl")
+# Load the trained model, compiled into a flat tree evaluator (shared read-only across sessions)
+model = load_predictor(MODEL_PATH)
 
 # Add custom CSS
 st.markdown("""
@@ -66,6 +71,9 @@ nav_options = {
     "Insights": "💡 Insights",
     "About": "ℹ️ About"
 }
+# Hidden performance page, shown with ?admin=<HEART_ADMIN_TOKEN> in the URL (off when the token is unset)
+if admin_allowed(st.query_params.get("admin")):
+    nav_options["Performance"] = "⏱️ Performance"
 
 selected_page = st.sidebar.selectbox(
     "Go to", 
@@ -74,17 +82,24 @@ selected_page = st.sidebar.selectbox(
     format_func=lambda x: nav_options[x],
     help="Scroll through to select the page."
 )
+# Page transitions decide which pages are prefetched in the background
+prefetcher.record_visit(st.session_state.get("previous_page"), selected_page)
+st.session_state["previous_page"] = selected_page
 
-# Load page based on selection
+# Load page based on selection. Page modules pull in matplotlib/seaborn,
+# so they are only imported when their page is opened. Chart pages receive a
+# read-only view of the dataset that is loaded once and shared by all sessions,
+# and render their figures concurrently after the rest of the page.
 if selected_page == "Prediction":
     st.markdown(
         "<h1 style='text-align: center; color: #4280f5; font-weight: bold;'>Heart Disease Prediction Web App</h1>", 
         unsafe_allow_html=True
     )
-    st.image("heart.jpg", use_column_width=True)  # Replace with your image path
+    # Banner images come pre-sized and recompressed from assets.py
+    show_image(st, "heart.jpg")
 
     # Sidebar images
-    st.sidebar.image("AI.jpg", use_column_width=True)  # Add another image
+    show_image(st.sidebar, "AI.jpg", max_width=SIDEBAR_WIDTH, sizes=SIDEBAR_SIZES)
 
     # Sidebar for user input
     st.sidebar.header("Input Features")
@@ -118,15 +133,36 @@ if selected_page == "Prediction":
     st.subheader('User Input Features')
     st.write(input_df)
 
-    prediction = model.predict(input_df)
+    # Repeated inputs are served from the process-wide cache; it resets when the model file changes
+    with span("predict"):
+        proba = prediction_cache.get_or_compute(
+            canonical_key(input_df, model.feature_names_in_),
+            lambda: model.predict_proba(input_df)[0],
+            fingerprint=resource_fingerprint("predictor", MODEL_PATH),
+        )
+    prediction = [model.classes_[proba.argmax()]]
 
     st.subheader('Prediction Result')
 
-    if prediction[0] == 'Warning ! Anomaly  detected in your heart.':
+    if prediction[0] == POSITIVE_CLASS:
         st.error("⚠️ Warning: Anomaly detected in your heart. There is a risk of heart disease.")
     else:
         st.success("😊 You are safe. No significant risk of heart disease detected.")
 
+    # Feature contributions for this input, from the forest's tree structure (cached per input vector)
+    explainer = load_explainer(MODEL_PATH)
+    if explainer is not None:
+        with st.expander("🧭 Why this prediction?", expanded=True):
+            from explain import explain_section
+            with span("explain"):
+                explain_section(explainer, input_df, fingerprint=resource_fingerprint("explainer", MODEL_PATH))
+
+    # What-if sweeps score a whole grid of perturbed inputs in one batched call
+    if st.toggle("🔬 What-if sensitivity", help="See how the risk changes as one or two inputs vary."):
+        from sensitivity import what_if_section
+        with span("what_if"):
+            what_if_section(model, input_df)
+
     st.markdown(
     """
     <div class="prediction-result" style="
@@ -144,15 +180,29 @@ if selected_page == "Prediction":
 )
 
 elif selected_page == "Visualize Data":
-    visualize_page(df)
+    from visualize import visualize_page
+    from figure_cache import page_figures
+    with span("page/visualize", profile=True), page_figures():
+        visualize_page(load_view(DATA_PATH), load_query(DATA_PATH))
 
 elif selected_page == "Analyze Data":
-    analyze_page(df)
+    from analyze import analyze_page
+    from figure_cache import page_figures
+    with span("page/analyze", profile=True), page_figures():
+        analyze_page(load_view(DATA_PATH), load_stats(DATA_PATH), load_query(DATA_PATH))
 
 elif selected_page == "Insights":
-    insights_page(df)
+    from insights import insights_page
+    from figure_cache import page_figures
+    with span("page/insights", profile=True), page_figures():
+        insights_page(load_view(DATA_PATH), load_stats(DATA_PATH))
+
+elif selected_page == "Performance":
+    from admin import admin_page
+    admin_page()
 
 elif selected_page == "About":
+    from about import about_page
     about_page()
     st.markdown(
         """
@@ -198,4 +248,27 @@ elif credits_option == "📧 Contact":
         """, unsafe_allow_html=True
     )
 
-st.sidebar.image("AI_heart.jpg", use_column_width=True)
+show_image(st.sidebar, "AI_heart.jpg", max_width=SIDEBAR_WIDTH, sizes=SIDEBAR_SIZES)
+
+# While on a page without charts, warm the chart pages this session is likely to open next
+if selected_page not in prefetcher.pages:
+    prefetcher.warm(prefetcher.likely_next(selected_page))
+
+# Debug panel, shown with ?debug=1 in the URL
+if st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🐞 Debug"):
+        st.write("Prediction cache:")
+        st.json(prediction_cache.stats())
+        st.write("Loaded resources:")
+        st.json(resource_stats())
+        # Only report the figure cache once a chart page has imported it (it pulls in matplotlib)
+        if "figure_cache" in sys.modules:
+            st.write("Figure cache:")
+            st.json(sys.modules["figure_cache"].figure_cache.stats())
+        st.write("Prefetch:")
+        st.json(prefetcher.stats())
+        if "explain" in sys.modules:
+            st.write("Explanation cache:")
+            st.json(sys.modules["explain"].explanation_cache.stats())
+
+perf_recorder.record(f"rerun/{selected_page}", time.perf_counter() - rerun_start)
@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+
+from resources import cached_resource, file_fingerprint
+
+# Pre-sized, recompressed variants of the page images. Passing the original
+# multi-megapixel JPEGs to st.image made Streamlit decode, resize and
+# re-encode them on every rerun; variants are built once instead, kept in an
+# in-memory byte cache shared by all sessions, and sized for where they are
+# shown.
+#
+#   python assets.py
+#
+# writes AVIF, WebP and progressive JPEG (PNG for images with transparency)
+# at each width in WIDTHS to static/, under content-hashed names, with a
+# manifest. With Streamlit's static serving on (server.enableStaticServing),
+# images are emitted as <picture> elements so browsers pick the best format
+# and width they support. The hashed files can be cached forever:
+# serve.py serves them at /assets/<name> with an immutable Cache-Control, and
+# HEART_ASSET_URL points the app at it (or at a CDN). Without a build, or
+# without static serving, the fallback format is built in memory on first use
+# and sent through st.image, which passes already-sized JPEG/PNG through
+# untouched.
+
+ASSET_DIR = "static"
+MANIFEST_PATH = os.path.join(ASSET_DIR, "assets.json")
+SOURCES = ("heart.jpg", "AI.jpg", "AI_heart.jpg", "ML_flowchart.png")
+# 1460 px is Streamlit's widest image (2 x its 730 px content column)
+WIDTHS = (480, 960, 1460)
+# Sidebar images render about 300 px wide (the full viewport on phones)
+SIDEBAR_WIDTH = 640
+SIDEBAR_SIZES = "(max-width: 640px) 100vw, 320px"
+ASSET_URL = os.environ.get("HEART_ASSET_URL", "app/static")
+
+# Best first; formats this Pillow build cannot write are skipped
+FORMATS = {
+    "avif": ("AVIF", {"quality": 55, "speed": 6}),
+    "webp": ("WEBP", {"quality": 75, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 82, "progressive": True, "optimize": True}),
+    "png": ("PNG", {"optimize": True}),
+}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+
+
+def available_formats():
+    from PIL import features
+
+    supported = []
+    for fmt in FORMATS:
+        try:
+            if fmt in ("jpeg", "png") or features.check(fmt):
+                supported.append(fmt)
+        except ValueError:
+            # Pillow releases that predate the feature name
+            pass
+    return supported
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def variant_widths(source_width):
+    # Never upscale: widths below the source, plus the source width capped at the largest
+    return [w for w in WIDTHS if w < source_width] + [min(source_width, WIDTHS[-1])]
+
+
+def encode(image, fmt, width):
+    from PIL import Image
+
+    if width < image.width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+class ImageAsset:
+    def __init__(self, source, alpha, size, variants, files=None):
+        self.source = source
+        self.alpha = alpha
+        self.size = size
+        # {(format, width): bytes}, and {(format, width): file name} when built to ASSET_DIR
+        self.variants = variants
+        self.files = files or {}
+
+    @property
+    def fallback(self):
+        return "png" if self.alpha else "jpeg"
+
+    def widths(self, fmt):
+        return sorted(width for f, width in self.variants if f == fmt)
+
+    def best(self, fmt, width):
+        # Smallest variant at least `width` wide, else the largest there is
+        widths = self.widths(fmt)
+        chosen = next((w for w in widths if w >= width), widths[-1])
+        return self.variants[(fmt, chosen)]
+
+    def picture_html(self, base_url, sizes="100vw", caption=None):
+        def srcset(fmt):
+            return ", ".join(f"{base_url}/{self.files[(fmt, w)]} {w}w" for w in self.widths(fmt))
+
+        sources = "".join(
+            f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset(fmt)}" sizes="{sizes}">'
+            for fmt in ("avif", "webp") if self.widths(fmt)
+        )
+        fallback = self.files[(self.fallback, self.widths(self.fallback)[-1])]
+        alt = caption or os.path.splitext(os.path.basename(self.source))[0]
+        img = (f'<img src="{base_url}/{fallback}" srcset="{srcset(self.fallback)}" sizes="{sizes}" alt="{alt}" '
+               f'loading="lazy" decoding="async" style="width: 100%; height: auto;">')
+        html = f"<picture>{sources}{img}</picture>"
+        if caption:
+            html = f'<figure style="margin: 0;">{html}<figcaption style="text-align: center; color: #888;">{caption}</figcaption></figure>'
+        return html
+
+
+def build_asset(path, formats=None):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+    alpha = _has_alpha(image)
+    formats = formats or available_formats()
+    # The fallback for transparent images is PNG, for everything else JPEG
+    formats = [fmt for fmt in formats if fmt != ("jpeg" if alpha else "png")]
+    variants = {
+        (fmt, width): encode(image, fmt, width)
+        for fmt in formats
+        for width in variant_widths(image.width)
+    }
+    return ImageAsset(path, alpha, image.size, variants)
+
+
+def read_manifest(out_dir=ASSET_DIR):
+    path = os.path.join(out_dir, os.path.basename(MANIFEST_PATH))
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_assets(sources=SOURCES, out_dir=ASSET_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for source in sources:
+        asset = build_asset(source)
+        stem = os.path.splitext(os.path.basename(source))[0]
+        entries = []
+        for (fmt, width), data in sorted(asset.variants.items()):
+            name = f"{stem}-{hashlib.sha256(data).hexdigest()[:12]}-{width}w.{fmt}"
+            with open(os.path.join(out_dir, name), "wb") as f:
+                f.write(data)
+            entries.append({"format": fmt, "width": width, "file": name, "bytes": len(data)})
+        manifest[os.path.basename(source)] = {
+            "fingerprint": file_fingerprint(source),
+            "source_bytes": os.path.getsize(source),
+            "size": list(asset.size),
+            "alpha": asset.alpha,
+            "variants": entries,
+        }
+    with open(os.path.join(out_dir, os.path.basename(MANIFEST_PATH)), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _read_asset(path, fingerprint):
+    # Prebuilt variants while they match the source, else the fallback format built in memory
+    entry = read_manifest().get(os.path.basename(path))
+    if entry is not None and entry["fingerprint"] == fingerprint and all(
+            os.path.exists(os.path.join(ASSET_DIR, v["file"])) for v in entry["variants"]):
+        variants, files = {}, {}
+        for v in entry["variants"]:
+            with open(os.path.join(ASSET_DIR, v["file"]), "rb") as f:
+                variants[(v["format"], v["width"])] = f.read()
+            files[(v["format"], v["width"])] = v["file"]
+        return ImageAsset(path, entry["alpha"], tuple(entry["size"]), variants, files)
+    return build_asset(path, formats=["jpeg", "png"])
+
+
+def load_asset(path):
+    return cached_resource("asset", path, _read_asset)
+
+
+def static_files(out_dir=ASSET_DIR):
+    # {file name: (bytes, mime type)} for every built variant, for serving over HTTP
+    files = {}
+    for entry in read_manifest(out_dir).values():
+        for v in entry["variants"]:
+            path = os.path.join(out_dir, v["file"])
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    files[v["file"]] = (f.read(), MIME_TYPES[v["format"]])
+    return files
+
+
+def show_image(container, path, caption=None, max_width=WIDTHS[-1], sizes="100vw"):
+    import streamlit as st
+
+    asset = load_asset(path)
+    if asset.files and st.get_option("server.enableStaticServing"):
+        container.markdown(asset.picture_html(ASSET_URL, sizes, caption), unsafe_allow_html=True)
+    else:
+        container.image(asset.best(asset.fallback, max_width), caption=caption, width="stretch")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build resized, recompressed variants of the app's images.")
+    parser.add_argument("sources", nargs="*", default=list(SOURCES))
+    parser.add_argument("--out", default=ASSET_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = write_assets(args.sources, args.out)
+    for source, entry in manifest.items():
+        print(f"{source}: {entry['source_bytes'] / 1024:,.0f} KiB", file=sys.stderr)
+        for v in entry["variants"]:
+            print(f"  {v['format']:<5} {v['width']:>5}w  {v['bytes'] / 1024:8,.0f} KiB  {v['file']}", file=sys.stderr)
+    print(f"Wrote {sum(len(e['variants']) for e in manifest.values())} files to {args.out}/", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
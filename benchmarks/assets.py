@@ -0,0 +1,89 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from assets import SIDEBAR_WIDTH, WIDTHS, load_asset
+
+# Image bytes and server time per page: the original files passed to
+# st.image, against the pre-built variants. "server_ms" is the image handling
+# Streamlit does on each rerun (read, decode, resize to its 1460 px maximum,
+# re-encode at JPEG q90 when needed), measured with Streamlit's own
+# image_to_url. Payloads for the <picture> formats are the variant a browser
+# would fetch at desktop widths and on a phone (480 px main image, 480 px
+# sidebar).
+#
+#   python assets.py && python -m benchmarks.assets
+
+PAGES = {
+    "Prediction": [("heart.jpg", "main"), ("AI.jpg", "sidebar"), ("AI_heart.jpg", "sidebar")],
+    "Visualize Data": [("AI_heart.jpg", "sidebar")],
+    "Analyze Data": [("AI_heart.jpg", "sidebar")],
+    "Insights": [("AI_heart.jpg", "sidebar")],
+    "About": [("ML_flowchart.png", "main"), ("AI_heart.jpg", "sidebar")],
+}
+DESKTOP = {"main": WIDTHS[-1], "sidebar": SIDEBAR_WIDTH}
+MOBILE = {"main": WIDTHS[0], "sidebar": WIDTHS[0]}
+
+
+def _streamlit_image(image, repeats):
+    # (bytes Streamlit sends, median seconds) for st.image(image, width="stretch")
+    from streamlit.elements.lib.image_utils import _ensure_image_size_and_format, _validate_image_format_string
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+
+    def process():
+        data = image
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                data = f.read()
+        return _ensure_image_size_and_format(data, LayoutConfig(width="stretch"), _validate_image_format_string(data, "auto"))
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sent = process()
+        samples.append(time.perf_counter() - start)
+    return len(sent), float(np.median(samples))
+
+
+def _variant_bytes(asset, fmt, width):
+    if not asset.widths(fmt):
+        return None
+    return len(asset.best(fmt, width))
+
+
+def run(repeats):
+    results = []
+    for page, images in PAGES.items():
+        original = [_streamlit_image(path, repeats) for path, _ in images]
+        fallback = [_streamlit_image(load_asset(path).best(load_asset(path).fallback, DESKTOP[place]), repeats)
+                    for path, place in images]
+        row = {
+            "page": page,
+            "images": len(images),
+            "original_kb": sum(size for size, _ in original) / 1024,
+            "original_server_ms": sum(seconds for _, seconds in original) * 1000,
+            "st_image_kb": sum(size for size, _ in fallback) / 1024,
+            "st_image_server_ms": sum(seconds for _, seconds in fallback) * 1000,
+        }
+        for fmt in ("avif", "webp", "jpeg"):
+            for label, widths in (("desktop", DESKTOP), ("mobile", MOBILE)):
+                sizes = []
+                for path, place in images:
+                    asset = load_asset(path)
+                    sizes.append(_variant_bytes(asset, fmt, widths[place]) or _variant_bytes(asset, asset.fallback, widths[place]))
+                row[f"{fmt}_{label}_kb"] = sum(sizes) / 1024
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Image payload and per-rerun server time per page.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_csv
+from columnar import ingest_csv
+
+# Load time and resident memory: pd.read_csv vs the memory-mapped columnar
+# format, at 270 rows (the shipped dataset size), 1M and 10M rows. "columnar"
+# opens the .columns directory directly; "app" goes through
+# resources.load_view, the path pages take, so it includes the CSV content
+# hash that checks the columnar copy is current. Each load runs in a fresh
+# interpreter so RSS deltas are not polluted by earlier runs.
+#
+#   python -m benchmarks.columnar_load
+#   python -m benchmarks.columnar_load --sizes 270 1000000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+import numpy as np
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+mode, path = sys.argv[1], sys.argv[2]
+if mode == "csv":
+    import pandas as pd
+    load = pd.read_csv
+elif mode == "columnar":
+    from columnar import load_columnar as load
+else:
+    from resources import load_view
+    load = lambda p: load_view(p).frame
+before = rss_mb()
+start = time.perf_counter()
+df = load(path)
+load_seconds = time.perf_counter() - start
+after_load = rss_mb()
+# Touch every numeric column, as a page computing summaries would
+df.select_dtypes("number").sum()
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "rss_after_load_mb": after_load - before,
+    "rss_after_scan_mb": rss_mb() - before,
+}))
+"""
+
+
+def _measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD, mode, path],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(sizes, workdir):
+    results = []
+    for rows in sizes:
+        csv_path = os.path.join(workdir, f"heart_{rows}.csv")
+        write_synthetic_csv(csv_path, rows)
+        start = time.perf_counter()
+        ingest_csv(csv_path)
+        ingest_seconds = time.perf_counter() - start
+        columns_path = os.path.splitext(csv_path)[0] + ".columns"
+        columnar_bytes = sum(os.path.getsize(os.path.join(columns_path, f)) for f in os.listdir(columns_path))
+        results.append({
+            "rows": rows,
+            "csv_bytes": os.path.getsize(csv_path),
+            "columnar_bytes": columnar_bytes,
+            "ingest_seconds": ingest_seconds,
+            "csv": _measure("csv", csv_path),
+            "columnar": _measure("columnar", columns_path),
+            "app": _measure("app", csv_path),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs memory-mapped columnar dataset loading.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[270, 1_000_000, 10_000_000])
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        print(json.dumps(run(args.sizes, workdir), indent=2))
+
+
+if __name__ == "__main__":
+    main()
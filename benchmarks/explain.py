@@ -0,0 +1,56 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_dataset
+from explain import TreeExplainer
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, load_model
+
+# Explanation throughput for one row (the Prediction page) and 10k rows (a
+# batch job), after checking that contributions add up to the forest's risk.
+#
+#   python -m benchmarks.explain
+#   python -m benchmarks.explain --rows 1 10000 100000
+
+
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeats):
+    model = load_model(MODEL_PATH)
+    start = time.perf_counter()
+    explainer = TreeExplainer.from_model(model)
+    build_seconds = time.perf_counter() - start
+
+    X = pd.read_csv(DATA_PATH).iloc[:, :-1]
+    positive = list(model.classes_).index(POSITIVE_CLASS)
+    additivity = np.abs(explainer.risk(X) - model.predict_proba(X)[:, positive]).max()
+    assert additivity < 1e-9, additivity
+
+    results = []
+    for rows in sizes:
+        batch = X.iloc[:rows] if rows <= len(X) else synthetic_dataset(rows)[list(X.columns)]
+        seconds = _best_of(lambda: explainer.shap_values(batch), repeats if rows < 1000 else 1)
+        results.append({"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds})
+    return {"build_seconds": build_seconds, "max_additivity_error": float(additivity), "runs": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TreeSHAP explanation throughput.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 10_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.rows, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
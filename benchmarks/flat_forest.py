@@ -0,0 +1,77 @@
+import argparse
+import json
+import timeit
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_dataset
+from flat_forest import FlatForest
+from resources import MODEL_PATH, dataset_schema, load_model
+
+# Parity check and latency benchmark: flat array evaluator vs sklearn's
+# model.predict / predict_proba at batch sizes 1, 100 and 100k, plus parity
+# on rows with missing (NaN) values and rejection of infinite ones.
+#
+#   python -m benchmarks.flat_forest
+
+
+def _best_of(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def check_missing(model, flat, data, seed=0):
+    # A share of cells blanked at random, plus one all-NaN row
+    rng = np.random.default_rng(seed)
+    X = data.iloc[:1000].mask(rng.random((1000, data.shape[1])) < 0.2)
+    X.iloc[0] = np.nan
+    max_diff = float(np.abs(model.predict_proba(X) - flat.predict_proba(X)).max())
+    if max_diff > 1e-12:
+        raise AssertionError(f"Flat forest diverges from sklearn on missing values: max diff {max_diff}")
+    X.iloc[0] = np.inf
+    for predictor in (model, flat):
+        try:
+            predictor.predict_proba(X)
+        except ValueError:
+            continue
+        raise AssertionError(f"{type(predictor).__name__} accepted an infinite value")
+    return max_diff
+
+
+def run(batch_sizes=(1, 100, 100_000), repeat=5):
+    model = load_model(MODEL_PATH)
+    flat = FlatForest.from_model(model)
+    features, _ = dataset_schema()
+    data = synthetic_dataset(max(batch_sizes), seed=42)[features]
+
+    results = []
+    for size in batch_sizes:
+        X = data.iloc[:size]
+        expected = model.predict_proba(X)
+        actual = flat.predict_proba(X)
+        max_diff = float(np.abs(expected - actual).max())
+        if max_diff > 1e-12 or not (model.predict(X) == flat.predict(X)).all():
+            raise AssertionError(f"Flat forest diverges from sklearn at batch size {size}: max diff {max_diff}")
+
+        reps = repeat if size < 10_000 else max(1, repeat // 2)
+        sklearn_s = _best_of(lambda: model.predict(X), reps)
+        flat_s = _best_of(lambda: flat.predict(X), reps)
+        results.append({
+            "batch_size": size,
+            "max_abs_diff": max_diff,
+            "sklearn_ms": sklearn_s * 1000,
+            "flat_ms": flat_s * 1000,
+            "speedup": sklearn_s / flat_s,
+        })
+    return {"n_estimators": flat.n_estimators, "n_nodes": len(flat.feature),
+            "missing_max_abs_diff": check_missing(model, flat, data), "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the flat forest evaluator against sklearn.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(repeat=args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.run import compare
+
+# Load test for one app.py process: N concurrent sessions, each an AppTest
+# on its own thread (as a server runs each session's script on its own
+# thread), replaying a random walk of page visits and widget changes. Every
+# rerun is timed. Sessions share the process's resource, figure and
+# prediction caches, the GIL and matplotlib's draw lock, which is where
+# concurrent sessions contend.
+#
+# Each session count runs in a fresh interpreter after one untimed pass over
+# every page, so all levels start from the same warm caches. Reported per
+# level: rerun latency percentiles per page, reruns per second, CPU used (in
+# cores) and the memory each session adds (peak RSS over the warmed-up RSS,
+# divided by the number of sessions). --baseline compares the latency
+# percentiles against a stored run and exits 1 on a regression, as run.py does.
+#
+#   python -m benchmarks.loadtest --sessions 1 2 4 8 --steps 20 --out load.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Prediction", "Visualize Data", "Analyze Data", "Insights", "About"]
+# Share of page visits: most sessions stay on the prediction form
+PAGE_WEIGHTS = [0.4, 0.15, 0.15, 0.15, 0.15]
+# Chance that a step moves to another page rather than changing a widget
+NAVIGATE = 0.3
+# Widgets a session changes on each page, by (kind, label)
+WIDGETS = {
+    "Prediction": [
+        ("slider", "Age"), ("slider", "Blood Pressure (BP)"), ("slider", "Cholesterol"),
+        ("slider", "Max Heart Rate (HR)"), ("slider", "ST depression"), ("selectbox", "Sex"),
+    ],
+    "Visualize Data": [
+        ("selectbox", "🔍 Select a column to visualize"), ("slider", "📊 Select number of bins"),
+        ("selectbox", "🔧 Select a column for Boxplot"), ("selectbox", "🔧 Select X-axis for Scatter Plot"),
+    ],
+    "Analyze Data": [
+        ("multiselect", "Select columns to analyze"), ("selectbox", "Select a column to view its distribution"),
+        ("selectbox", "Select a categorical column for Count Plot"),
+    ],
+    "Insights": [
+        ("slider", "Select number of Cholesterol Bins for Age Distribution"), ("slider", "Select Age Range"),
+    ],
+    "About": [],
+}
+RSS_INTERVAL = 0.05
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _change(widget, kind, rng):
+    if kind == "selectbox":
+        return widget.select(rng.choice(widget.options))
+    if kind == "multiselect":
+        return widget.set_value(rng.sample(widget.options, rng.randint(1, min(3, len(widget.options)))))
+    # Sliders: a random value on the step grid (a random range for range sliders), in the slider's own type
+    steps = int(round((widget.max - widget.min) / widget.step))
+    current = widget.value[0] if isinstance(widget.value, tuple) else widget.value
+    cast = int if isinstance(current, int) else float
+
+    def pick():
+        return cast(round(widget.min + rng.randint(0, steps) * widget.step, 6))
+
+    if isinstance(widget.value, tuple):
+        return widget.set_value(tuple(sorted((pick(), pick()))))
+    return widget.set_value(pick())
+
+
+def _widget(at, kind, label):
+    return next((w for w in at.get(kind) if w.label == label), None)
+
+
+class Session:
+    def __init__(self, seed, steps):
+        self.rng = random.Random(seed)
+        self.steps = steps
+        self.samples = []
+        self.errors = []
+
+    def _rerun(self, at, page, run):
+        start = time.perf_counter()
+        run()
+        self.samples.append((page, time.perf_counter() - start))
+        if at.exception:
+            self.errors.append(f"{page}: {at.exception[0].message}")
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=3600)
+        page = "Prediction"
+        self._rerun(at, page, at.run)
+        for _ in range(self.steps):
+            candidates = [(kind, label) for kind, label in WIDGETS[page] if _widget(at, kind, label) is not None]
+            if not candidates or self.rng.random() < NAVIGATE:
+                page = self.rng.choices(PAGES, PAGE_WEIGHTS)[0]
+                self._rerun(at, page, at.sidebar.selectbox[0].select(page).run)
+            else:
+                kind, label = self.rng.choice(candidates)
+                self._rerun(at, page, _change(_widget(at, kind, label), kind, self.rng).run)
+
+
+def _warm_up():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=3600).run()
+    for page in PAGES[1:]:
+        at.sidebar.selectbox[0].select(page).run()
+        assert not at.exception, at.exception
+
+
+def run_level(n_sessions, steps, seed):
+    sys.path.insert(0, ROOT)
+    _warm_up()
+    baseline_rss = _rss_mb()
+    peak = [baseline_rss]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(RSS_INTERVAL):
+            peak[0] = max(peak[0], _rss_mb())
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    sessions = [Session(seed + i, steps) for i in range(n_sessions)]
+    threads = [threading.Thread(target=session.run, name=f"session-{i}") for i, session in enumerate(sessions)]
+    cpu_start, wall_start = os.times(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cpu_end, wall = os.times(), time.perf_counter() - wall_start
+    done.set()
+    sampler.join()
+
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    samples = [sample for session in sessions for sample in session.samples]
+    latencies = {}
+    for page in PAGES:
+        seconds = np.array([s for p, s in samples if p == page])
+        if len(seconds):
+            latencies[page] = {"reruns": len(seconds), **{
+                f"p{q}": float(np.percentile(seconds, q)) for q in (50, 90, 99)}, "max": float(seconds.max())}
+    return {
+        "sessions": n_sessions,
+        "reruns": len(samples),
+        "errors": [error for session in sessions for error in session.errors],
+        "seconds": wall,
+        "reruns_per_second": len(samples) / wall,
+        "cpu_cores": cpu / wall,
+        "cpu_ms_per_rerun": cpu / len(samples) * 1000,
+        "rss_mb_warm": baseline_rss,
+        "rss_mb_peak": peak[0],
+        "rss_mb_per_session": (peak[0] - baseline_rss) / n_sessions,
+        "pages": latencies,
+    }
+
+
+def measure(n_sessions, steps, seed, prefetch):
+    env = dict(os.environ, HEART_PREFETCH="1" if prefetch else "0")
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "benchmarks.loadtest", "--level", str(n_sessions),
+         "--steps", str(steps), "--seed", str(seed)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def as_metrics(level):
+    # Latency percentiles in the {"metrics": {name: seconds}} shape run.compare expects
+    return {"metrics": {f"page/{page}/{q}": stats[q] for page, stats in level["pages"].items()
+                        for q in ("p50", "p90", "p99")}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of app.py.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--steps", type=int, default=20, help="Page visits and widget changes per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prefetch", action="store_true", help="Keep background page prefetching on")
+    parser.add_argument("--out", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.level is not None:
+        # One session count, in this interpreter (run by measure())
+        print(json.dumps(run_level(args.level, args.steps, args.seed)))
+        return 0
+
+    levels = []
+    for n_sessions in args.sessions:
+        print(f"{n_sessions} sessions...", file=sys.stderr)
+        levels.append(measure(n_sessions, args.steps, args.seed, args.prefetch))
+        level = levels[-1]
+        print(f"  {level['reruns_per_second']:.2f} reruns/s, {level['cpu_cores']:.2f} cores, "
+              f"{level['rss_mb_per_session']:.1f} MB/session, {len(level['errors'])} errors", file=sys.stderr)
+    single = next((level for level in levels if level["sessions"] == 1), None)
+    for level in levels:
+        # Throughput gained per added session; 1.0 is perfect scaling
+        if single is not None:
+            level["scaling_efficiency"] = level["reruns_per_second"] / (single["reruns_per_second"] * level["sessions"])
+    results = {"steps": args.steps, "seed": args.seed, "prefetch": args.prefetch, "levels": levels,
+               "scales": {f"{level['sessions']}_sessions": as_metrics(level) for level in levels}}
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        results["comparison"] = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "metrics": [
+                {"sessions": scale, "metric": name, "baseline_seconds": old, "seconds": new, "ratio": ratio,
+                 "regressed": regressed}
+                for scale, name, old, new, ratio, regressed in rows
+            ],
+        }
+        for scale, name, old, new, ratio, regressed in rows:
+            print(f"{scale:>12} {name:<30} {old * 1000:10.2f} ms -> {new * 1000:10.2f} ms  x{ratio:5.2f}"
+                  f"{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    errors = sum(len(level["errors"]) for level in levels)
+    regressed = any(m["regressed"] for m in results.get("comparison", {}).get("metrics", []))
+    return 1 if errors or regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
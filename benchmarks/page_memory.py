@@ -0,0 +1,72 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+# Per-session allocation growth across reruns of the chart pages. Each page
+# is opened in a fresh AppTest session, warmed up (figures cached, view and
+# stats loaded), then rerun repeatedly while tracemalloc tracks the live
+# heap. With pages working on the shared read-only dataset view, the heap
+# should stay flat; growth above --tolerance-kb per rerun is flagged.
+#
+#   python -m benchmarks.page_memory --reruns 20
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Background page prefetching would allocate between samples
+os.environ["HEART_PREFETCH"] = "0"
+PAGES = ["Visualize Data", "Analyze Data", "Insights"]
+
+
+def _traced_kb():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024
+
+
+def measure(page, reruns, warmup):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300).run()
+    at.sidebar.selectbox[0].select(page).run()
+    for _ in range(warmup):
+        at.run()
+    assert not at.exception, at.exception
+
+    samples = []
+    for _ in range(reruns):
+        at.run()
+        samples.append(_traced_kb())
+    growth = [b - a for a, b in zip(samples, samples[1:])]
+    return {
+        "page": page,
+        "reruns": reruns,
+        "heap_start_kb": samples[0],
+        "heap_end_kb": samples[-1],
+        "growth_per_rerun_kb": (samples[-1] - samples[0]) / max(reruns - 1, 1),
+        "max_step_kb": max(growth, default=0.0),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that page reruns do not grow the per-session heap.")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--tolerance-kb", type=float, default=64.0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    tracemalloc.start()
+    results = []
+    for page in args.pages:
+        result = measure(page, args.reruns, args.warmup)
+        result["flat"] = result["growth_per_rerun_kb"] <= args.tolerance_kb
+        results.append(result)
+    tracemalloc.stop()
+    print(json.dumps(results, indent=2))
+    return 0 if all(r["flat"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
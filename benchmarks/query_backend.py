@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.run import BASE_ROWS
+from benchmarks.synthetic import write_synthetic_csv
+from query_backend import duckdb_available, write_parquet
+
+# Column explorer and count plot queries per backend, on synthetic copies of
+# the dataset at several multiples of its size. Each backend runs in a fresh
+# interpreter so "open" is cold (for pandas it includes parsing the CSV into
+# the shared frame) and peak RSS is its own; queries are timed on first use
+# and again from the backend's result cache.
+#
+#   python -m benchmarks.query_backend --scales 1 1000 10000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+from resources import DATA_PATH, load_query
+
+def status_mb(field):
+    # VmHWM is this process's peak RSS (ru_maxrss would carry over the parent's through fork)
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":")) / 1024
+
+metrics = {}
+def timed(name, fn):
+    start = time.perf_counter()
+    fn()
+    metrics[name] = time.perf_counter() - start
+
+before = status_mb("VmRSS")
+start = time.perf_counter()
+query = load_query(DATA_PATH)
+metrics["open"] = time.perf_counter() - start
+queries = {
+    "value_counts": lambda: query.value_counts("Heart Health"),
+    "unique": lambda: query.unique("Age"),
+    "describe_numeric": lambda: query.describe(["Age", "Cholesterol", "ST depression"]),
+    "describe_categorical": lambda: query.describe(["Heart Health"]),
+}
+for name, fn in queries.items():
+    timed(name, fn)
+for name, fn in queries.items():
+    timed(f"{name}/cached", fn)
+peak = status_mb("VmHWM")
+print(json.dumps({"backend": query.name, "seconds": metrics, "rss_mb_before": before, "peak_rss_mb": peak}))
+"""
+
+
+def measure(csv_path, backend):
+    env = dict(os.environ, HEART_DATA_PATH=csv_path, HEART_QUERY_BACKEND=backend, HEART_PREFETCH="0")
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", CHILD], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(scales, workdir, backends):
+    results = {}
+    for scale in scales:
+        rows = BASE_ROWS * scale
+        csv_path = os.path.join(workdir, f"heart_x{scale}.csv")
+        if not os.path.exists(csv_path):
+            write_synthetic_csv(csv_path, rows)
+        write_parquet(csv_path)
+        print(f"{scale}x ({rows:,} rows)...", file=sys.stderr)
+        results[f"{scale}x"] = [measure(csv_path, backend) for backend in backends]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explorer query latency and memory per query backend.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 1000, 10000],
+                        help=f"Multiples of the {BASE_ROWS}-row dataset")
+    parser.add_argument("--backends", nargs="+", choices=["pandas", "arrow", "duckdb"])
+    parser.add_argument("--data-dir", help="Keep the synthetic CSVs here between runs (default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    backends = args.backends or ["pandas", "arrow"] + (["duckdb"] if duckdb_available() else [])
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        results = run(args.scales, args.data_dir, backends)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(args.scales, workdir, backends)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_dataset
+from range_index import RangeFilter
+
+# Sidebar range filters: boolean masks over the whole frame vs the sorted
+# column indexes, on Age-only and Age+Cholesterol queries of varying width.
+# Every query is checked for identical rows before it is timed.
+#
+#   python -m benchmarks.range_filter --rows 1000000
+
+QUERIES = [
+    {"Age": (50, 55)},
+    {"Age": (29, 77)},
+    {"Age": (50, 55), "Cholesterol": (200, 240)},
+    {"Age": (29, 77), "Cholesterol": (126, 564)},
+]
+
+
+def _mask_rows(df, ranges):
+    mask = np.ones(len(df), dtype=bool)
+    for column, (low, high) in ranges.items():
+        mask &= ((df[column] >= low) & (df[column] <= high)).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, repeats):
+    df = synthetic_dataset(rows)
+    start = time.perf_counter()
+    index = RangeFilter(df, ["Age", "Cholesterol"])
+    build_seconds = time.perf_counter() - start
+
+    results = []
+    for ranges in QUERIES:
+        expected = _mask_rows(df, ranges)
+        assert np.array_equal(expected, index.rows(ranges)), ranges
+        assert index.count(ranges) == len(expected), ranges
+        results.append({
+            "ranges": {column: list(bounds) for column, bounds in ranges.items()},
+            "matches": len(expected),
+            "mask_seconds": _best_of(lambda: _mask_rows(df, ranges), repeats),
+            "index_seconds": _best_of(lambda: index.rows(ranges), repeats),
+            "index_count_seconds": _best_of(lambda: index.count(ranges), repeats),
+        })
+    return {"rows": rows, "index_build_seconds": build_seconds, "queries": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark boolean-mask vs indexed range filters.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[270, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+    print(json.dumps([run(rows, args.repeats) for rows in args.rows], indent=2))
+
+
+if __name__ == "__main__":
+    main()
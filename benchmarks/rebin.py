@@ -0,0 +1,85 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_dataset
+from hist_cube import ColumnCube, JointCube
+
+# Bin-count slider cost: re-histogramming (plus KDE refit) the raw column vs
+# re-binning the pre-aggregated cube, across the range of slider values.
+# Also checks the cube's counts and box-plot medians against the raw data.
+#
+#   python -m benchmarks.rebin --rows 270 1000000
+
+SLIDER_BINS = range(10, 101, 10)
+CHOLESTEROL_BINS = range(5, 31, 5)
+
+
+def _raw_histogram(values, bins):
+    counts, edges = np.histogram(values, bins=bins)
+    # seaborn's KDE overlay evaluates a scipy gaussian_kde on a 200-point grid
+    from scipy.stats import gaussian_kde
+    gaussian_kde(values)(np.linspace(values.min(), values.max(), 200))
+    return counts, edges
+
+
+def _raw_box(df, bins):
+    return df.groupby(pd.cut(df["Cholesterol"], bins=bins), observed=False)["Age"].median()
+
+
+def run(rows):
+    df = synthetic_dataset(rows)
+    age = df["Age"].to_numpy(dtype=float)
+
+    start = time.perf_counter()
+    cube = ColumnCube(age)
+    joint = JointCube(df["Cholesterol"], df["Age"])
+    build_seconds = time.perf_counter() - start
+
+    for bins in (10, 30, 100):
+        assert np.array_equal(cube.histogram(bins)[0], np.histogram(age, bins=bins)[0]), bins
+    for bins in (5, 10, 30):
+        medians = [stat["med"] if stat else np.nan for stat in joint.box_stats(bins)[1]]
+        assert np.allclose(medians, _raw_box(df, bins).to_numpy(), equal_nan=True), bins
+
+    start = time.perf_counter()
+    for bins in SLIDER_BINS:
+        _raw_histogram(age, bins)
+    raw_hist = (time.perf_counter() - start) / len(SLIDER_BINS)
+    start = time.perf_counter()
+    for bins in SLIDER_BINS:
+        cube.histogram(bins)
+        cube.kde(bins)
+    cube_hist = (time.perf_counter() - start) / len(SLIDER_BINS)
+
+    start = time.perf_counter()
+    for bins in CHOLESTEROL_BINS:
+        _raw_box(df, bins)
+    raw_box = (time.perf_counter() - start) / len(CHOLESTEROL_BINS)
+    start = time.perf_counter()
+    for bins in CHOLESTEROL_BINS:
+        joint.box_stats(bins)
+    cube_box = (time.perf_counter() - start) / len(CHOLESTEROL_BINS)
+
+    return {
+        "rows": rows,
+        "cube_build_seconds": build_seconds,
+        "histogram_raw_seconds": raw_hist,
+        "histogram_cube_seconds": cube_hist,
+        "boxplot_raw_seconds": raw_box,
+        "boxplot_cube_seconds": cube_box,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark slider re-binning from raw rows vs pre-aggregated cubes.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[270, 1_000_000])
+    args = parser.parse_args(argv)
+    print(json.dumps([run(rows) for rows in args.rows], indent=2))
+
+
+if __name__ == "__main__":
+    main()
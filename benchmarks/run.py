@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic_csv
+
+# Benchmark suite for the hot paths, run headless: model load, single-row and
+# batch prediction, dataset/view/stats loading, and every page rendered
+# through Streamlit's AppTest, on synthetic copies of the dataset at several
+# multiples of its size. Each scale runs in a fresh interpreter pointed at the
+# synthetic CSV with HEART_DATA_PATH, so every load is cold; with --repeat N
+# it runs N times and each metric is its fastest run (cold loads and page
+# renders are single samples, and noise only ever adds time). Page sections
+# (each figure's draw and encode, the describe table, ...) come from the
+# perf.py spans the app records while rendering.
+#
+# Results are JSON. --baseline compares against a stored run and exits 1 when
+# a metric got slower than --threshold times its baseline; on its own it uses
+# benchmarks/baseline.json, a run of the default scales kept in the repo
+# (regenerate it with --out after an intended change, on the machine that
+# gates). Larger scales are opt-in: 100000x is a 27M-row, ~2 GB CSV.
+#
+#   python -m benchmarks.run --baseline
+#   python -m benchmarks.run --scales 1 1000 --out bench.json
+#   python -m benchmarks.run --scales 1 1000 --baseline bench.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_ROWS = len(pd.read_csv(os.path.join(ROOT, "Heart_Disease_Prediction.csv")))
+PAGES = ["Prediction", "Visualize Data", "Analyze Data", "Insights"]
+DEFAULT_SCALES = [1, 100]
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+# Differences below this are noise at any ratio
+MIN_REGRESSION_SECONDS = 0.005
+
+CHILD = r"""
+import json, sys, time
+import numpy as np
+
+app, pages, row_repeats, batch_rows = sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+metrics = {}
+
+def timed(name, fn):
+    start = time.perf_counter()
+    value = fn()
+    metrics[name] = time.perf_counter() - start
+    return value
+
+def median_seconds(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+from resources import DATA_PATH, MODEL_PATH, load_dataset, load_model, load_predictor, load_stats, load_view
+model = timed("load/model", lambda: load_model(MODEL_PATH))
+predictor = timed("load/predictor", lambda: load_predictor(MODEL_PATH))
+df = timed("load/dataset", lambda: load_dataset(DATA_PATH))
+timed("load/view", lambda: load_view(DATA_PATH))
+timed("load/stats", lambda: load_stats(DATA_PATH))
+
+X = df[list(predictor.feature_names_in_)]
+row = X.iloc[[0]]
+batch = X.iloc[np.arange(batch_rows) % len(X)]
+metrics["predict/row"] = median_seconds(lambda: predictor.predict_proba(row), row_repeats)
+metrics["predict/batch"] = median_seconds(lambda: predictor.predict_proba(batch), 5)
+metrics["predict/row_sklearn"] = median_seconds(lambda: model.predict_proba(row), row_repeats)
+metrics["predict/batch_sklearn"] = median_seconds(lambda: model.predict_proba(batch), 5)
+
+from perf import perf_recorder
+from streamlit.testing.v1 import AppTest
+perf_recorder.clear()
+at = AppTest.from_file(app, default_timeout=3600)
+for page in pages:
+    if page == "Prediction":
+        timed("page/Prediction/cold", at.run)
+    else:
+        timed(f"page/{page}/cold", at.sidebar.selectbox[0].select(page).run)
+    assert not at.exception, at.exception
+    # Same page again: the rerun path users hit on every widget change
+    timed(f"page/{page}/warm", at.run)
+    assert not at.exception, at.exception
+
+for name, stats in perf_recorder.stats().items():
+    if not name.startswith("rerun/"):
+        metrics[f"section/{name}"] = stats["total_seconds"] / stats["count"]
+print(json.dumps({"rows": len(df), "metrics": metrics}))
+"""
+
+
+def measure(csv_path, pages, row_repeats, batch_rows):
+    # Prefetching would warm the pages before their "cold" run
+    env = dict(os.environ, HEART_DATA_PATH=csv_path, HEART_PREFETCH="0")
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD, os.path.join(ROOT, "app.py"), json.dumps(pages),
+         str(row_repeats), str(batch_rows)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _best_run(runs):
+    metrics = {name: min(r["metrics"][name] for r in runs if name in r["metrics"])
+               for name in runs[0]["metrics"]}
+    return {"rows": runs[0]["rows"], "metrics": metrics}
+
+
+def run(scales, workdir, pages=PAGES, row_repeats=200, batch_rows=1_000, repeat=1):
+    results = {}
+    for scale in scales:
+        rows = BASE_ROWS * scale
+        csv_path = os.path.join(workdir, f"heart_x{scale}.csv")
+        if not os.path.exists(csv_path):
+            write_synthetic_csv(csv_path, rows)
+        print(f"{scale}x ({rows:,} rows)...", file=sys.stderr)
+        results[f"{scale}x"] = _best_run([measure(csv_path, pages, row_repeats, batch_rows) for _ in range(repeat)])
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "scales": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    # (scale, metric, baseline seconds, current seconds, ratio, regressed) for metrics present in both runs
+    rows = []
+    for scale, result in current["scales"].items():
+        before = baseline.get("scales", {}).get(scale)
+        if before is None:
+            continue
+        for name, seconds in result["metrics"].items():
+            old = before["metrics"].get(name)
+            if old is None:
+                continue
+            ratio = seconds / old if old > 0 else float("inf")
+            regressed = ratio > threshold and seconds - old > MIN_REGRESSION_SECONDS
+            rows.append((scale, name, old, seconds, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model load, prediction and every page at several data scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help=f"Multiples of the {BASE_ROWS}-row dataset")
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=PAGES)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scale; each metric is the fastest")
+    parser.add_argument("--data-dir", help="Keep the synthetic CSVs here between runs (default: a temporary directory)")
+    parser.add_argument("--out", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH,
+                        help="Results JSON from an earlier run to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Slowdown ratio that counts as a regression (single renders vary ~30%% run to run)")
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        results = run(args.scales, args.data_dir, args.pages, repeat=args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(args.scales, workdir, args.pages, repeat=args.repeat)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        results["comparison"] = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "metrics": [
+                {"scale": scale, "metric": name, "baseline_seconds": old, "seconds": new, "ratio": ratio, "regressed": regressed}
+                for scale, name, old, new, ratio, regressed in rows
+            ],
+        }
+        for scale, name, old, new, ratio, regressed in rows:
+            print(f"{scale:>8} {name:<55} {old * 1000:10.2f} ms -> {new * 1000:10.2f} ms  x{ratio:5.2f}"
+                  f"{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if any(m["regressed"] for m in results.get("comparison", {}).get("metrics", [])) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
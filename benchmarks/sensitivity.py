@@ -0,0 +1,58 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, load_model, load_predictor
+from sensitivity import MAX_POINTS_2D, grid_values, sweep, sweep_2d
+
+# What-if sweeps: one predict_proba call per grid point (what moving a
+# slider does) vs the whole grid in a single batch, for the sklearn forest
+# and the flat evaluator the app serves. The batched risks are checked
+# against the per-point ones.
+#
+#   python -m benchmarks.sensitivity
+
+
+def _per_point(model, row, feature, values):
+    risks = []
+    for value in values:
+        rows = row.copy()
+        rows[feature] = value
+        risks.append(model.predict_proba(rows[list(model.feature_names_in_)])[0])
+    return np.array(risks)
+
+
+def run(model, row, name):
+    values = grid_values('Cholesterol')
+    start = time.perf_counter()
+    looped = _per_point(model, row, 'Cholesterol', values)
+    loop_seconds = time.perf_counter() - start
+    risk, batch_seconds = sweep(model, row, 'Cholesterol', values)
+    assert np.allclose(risk, looped[:, list(model.classes_).index(POSITIVE_CLASS)])
+
+    x_values = grid_values('Cholesterol', MAX_POINTS_2D)
+    y_values = grid_values('Age', MAX_POINTS_2D)
+    grid, grid_seconds = sweep_2d(model, row, 'Cholesterol', x_values, 'Age', y_values)
+    return {
+        "model": name,
+        "points_1d": len(values),
+        "per_point_seconds": loop_seconds,
+        "batched_seconds": batch_seconds,
+        "points_2d": grid.size,
+        "batched_2d_seconds": grid_seconds,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-point vs batched what-if sweeps.")
+    parser.parse_args(argv)
+    row = pd.read_csv(DATA_PATH).iloc[[0], :-1].reset_index(drop=True)
+    results = [run(load_model(MODEL_PATH), row, "sklearn"), run(load_predictor(MODEL_PATH), row, "flat_forest")]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from resources import DATA_PATH, dataset_schema
+
+# Load generator for serve.py. Replays random patients from the dataset
+# with a fixed number of concurrent clients against a local server.
+#
+#   python serve.py &
+#   python -m benchmarks.serve_load --concurrency 64 --requests 5000
+
+
+async def _client(session, url, payloads, count, latencies, errors):
+    for _ in range(count):
+        payload = random.choice(payloads)
+        start = time.perf_counter()
+        try:
+            async with session.post(url, json=payload) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as exc:
+            errors.append(str(exc))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url, concurrency, total_requests):
+    features, _ = dataset_schema(DATA_PATH)
+    payloads = pd.read_csv(DATA_PATH)[features].to_dict(orient="records")
+
+    latencies = []
+    errors = []
+    per_client = max(1, total_requests // concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _client(session, f"{base_url}/predict", payloads, per_client, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+        async with session.get(f"{base_url}/metrics") as response:
+            server_metrics = await response.json()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "client_p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+        "client_p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+        "server": server_metrics,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against the local inference service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.url, args.concurrency, args.requests))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
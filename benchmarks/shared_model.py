@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from shared_model import export_model
+
+# Worker start-up time and memory with N server processes on one box, each
+# loading the model the way the app does (load_predictor + load_explainer):
+#
+#   pickle  every worker unpickles the sklearn forest, compiles the flat
+#           evaluator and builds the explainer tables itself
+#   shared  the model is exported once (shared_model.py) and every worker
+#           memory-maps the same files read-only
+#   none    workers import the same app modules but load no model: the floor
+#
+# All N workers are started together, answer one prediction and explanation
+# (so the model pages are touched), and are measured while all are alive.
+# PSS splits shared pages evenly between the processes that map them, so the
+# sum over workers is the box's real memory cost; "private" is what each
+# worker holds alone.
+#
+#   python -m benchmarks.shared_model --workers 1 2 4 8
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL = os.path.join(ROOT, "RF_heart_disease_model.pkl")
+MODES = ("pickle", "shared", "none")
+
+WORKER = r"""
+import json, sys, time
+start = time.perf_counter()
+import pandas as pd
+from resources import DATA_PATH, MODEL_PATH, load_explainer, load_predictor
+# What a worker imports anyway (explain pulls in streamlit); sklearn is left to the model load
+import compact, explain
+imported = time.perf_counter()
+row = pd.read_csv(DATA_PATH, nrows=1)
+if sys.argv[1] != "none":
+    predictor = load_predictor(MODEL_PATH)
+    explainer = load_explainer(MODEL_PATH)
+    X = row[list(predictor.feature_names_in_)]
+    predictor.predict_proba(X)
+    explainer.shap_values(X)
+ready = time.perf_counter()
+print(json.dumps({"import_seconds": imported - start, "load_seconds": ready - imported}), flush=True)
+sys.stdin.readline()
+memory = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        name, _, value = line.partition(":")
+        if value.strip().endswith("kB"):
+            memory[name] = int(value.split()[0])
+print(json.dumps(memory), flush=True)
+"""
+
+
+def _model_dir(workdir, mode):
+    # A copy of the model per mode, so only the "shared" copy has an export next to it
+    directory = os.path.join(workdir, mode)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, os.path.basename(MODEL))
+    shutil.copy2(MODEL, path)
+    if mode == "shared":
+        export_model(path)
+    return path
+
+
+def measure(mode, model_path, n_workers):
+    env = dict(os.environ, HEART_MODEL_PATH=model_path, HEART_PREFETCH="0")
+    start = time.perf_counter()
+    workers = [
+        subprocess.Popen([sys.executable, "-W", "ignore", "-c", WORKER, mode], cwd=ROOT, env=env,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(n_workers)
+    ]
+    timings = [json.loads(worker.stdout.readline()) for worker in workers]
+    all_ready = time.perf_counter() - start
+    memory = []
+    for worker in workers:
+        worker.stdin.write("\n")
+        worker.stdin.flush()
+        memory.append(json.loads(worker.stdout.readline()))
+    for worker in workers:
+        worker.wait()
+
+    rss = np.array([m["Rss"] for m in memory]) / 1024
+    pss = np.array([m["Pss"] for m in memory]) / 1024
+    private = np.array([m["Private_Clean"] + m["Private_Dirty"] for m in memory]) / 1024
+
+    return {
+        "mode": mode,
+        "workers": n_workers,
+        "load_seconds_median": float(np.median([t["load_seconds"] for t in timings])),
+        "import_seconds_median": float(np.median([t["import_seconds"] for t in timings])),
+        "all_ready_seconds": all_ready,
+        "rss_mb_mean": float(rss.mean()),
+        "pss_mb_mean": float(pss.mean()),
+        "private_mb_mean": float(private.mean()),
+        "pss_mb_total": float(pss.sum()),
+    }
+
+
+def run(worker_counts, modes=MODES):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {mode: _model_dir(workdir, mode) for mode in modes}
+        for n_workers in worker_counts:
+            for mode in modes:
+                print(f"{n_workers} x {mode}...", file=sys.stderr)
+                results.append(measure(mode, paths[mode], n_workers))
+    # Memory the model itself adds per worker, over workers that load none
+    floor = {r["workers"]: r for r in results if r["mode"] == "none"}
+    for r in results:
+        if r["workers"] in floor and r["mode"] != "none":
+            r["model_pss_mb_per_worker"] = r["pss_mb_mean"] - floor[r["workers"]]["pss_mb_mean"]
+            r["model_private_mb_per_worker"] = r["private_mb_mean"] - floor[r["workers"]]["private_mb_mean"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker load time and memory, pickled versus shared model.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.workers, args.modes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
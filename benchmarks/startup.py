@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Cold-start benchmark: time from process start to the first rendered
+# prediction, plus peak RSS and whether plotting libraries were imported.
+# --eager imports every page module up front, reproducing the old app.py.
+#
+#   python -m benchmarks.startup --runs 5
+#   python -m benchmarks.startup --runs 5 --eager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+if {eager}:
+    import visualize, analyze, insights, about
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+assert not at.exception, at.exception
+assert at.success or at.error, "no prediction rendered"
+print(json.dumps({{
+    "in_process_seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "matplotlib_loaded": "matplotlib" in sys.modules,
+    "seaborn_loaded": "seaborn" in sys.modules,
+}}))
+"""
+
+
+def measure(eager):
+    code = CHILD.format(eager=eager, app=os.path.join(ROOT, "app.py"))
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        cwd=ROOT, env=dict(os.environ, HEART_PREFETCH="0"), check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["wall_seconds"] = time.perf_counter() - start
+    return result
+
+
+def run(runs, eager):
+    samples = [measure(eager) for _ in range(runs)]
+    return {
+        "mode": "eager" if eager else "lazy",
+        "runs": runs,
+        "wall_seconds_min": min(s["wall_seconds"] for s in samples),
+        "wall_seconds_median": sorted(s["wall_seconds"] for s in samples)[runs // 2],
+        "max_rss_mb": max(s["max_rss_mb"] for s in samples),
+        "matplotlib_loaded": samples[0]["matplotlib_loaded"],
+        "seaborn_loaded": samples[0]["seaborn_loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app cold start to first prediction.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--eager", action="store_true", help="Import all page modules up front (old behaviour)")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.runs, args.eager), indent=2))
+
+
+if __name__ == "__main__":
+    main()
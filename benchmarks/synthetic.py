@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from resources import DATA_PATH
+
+# Synthetic datasets with the Heart_Disease_Prediction.csv schema. Each column
+# is drawn independently from its empirical distribution, so values stay in
+# realistic ranges while rows are new combinations the model has not seen.
+
+
+def synthetic_dataset(n_rows, seed=0, source=DATA_PATH):
+    base = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        column: base[column].to_numpy()[rng.integers(0, len(base), n_rows)]
+        for column in base.columns
+    })
+
+
+def write_synthetic_csv(path, n_rows, seed=0, chunk_rows=1_000_000):
+    # Written in chunks so very large scales never sit in memory at once
+    for start in range(0, n_rows, chunk_rows):
+        chunk = synthetic_dataset(min(chunk_rows, n_rows - start), seed=seed + start)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path
@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import StreamingStats
+
+# Typed columnar copy of the CSV dataset: one .npy file per column with the
+# narrowest dtype that holds it (int8/int16/... for integer columns, float32
+# for floats, integer codes plus a category list for text columns) and a
+# schema.json holding the dtypes, row count and the source CSV fingerprint.
+# Columns are memory-mapped on load, so opening the dataset parses nothing
+# and copies nothing until pages touch the data.
+#
+#   python columnar.py Heart_Disease_Prediction.csv
+
+SCHEMA_FILE = "schema.json"
+CHUNK_ROWS = 1_000_000
+
+
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".columns"
+
+
+def integer_dtype(low, high):
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def infer_schema(stats):
+    # Narrowest dtypes from a StreamingStats pass over the CSV
+    columns = []
+    for column in stats.columns:
+        if column in stats.numeric_columns:
+            i = stats.numeric_columns.index(column)
+            if column in stats.integer_columns and not stats.nulls[column]:
+                dtype = integer_dtype(stats.minimum[i], stats.maximum[i])
+            else:
+                dtype = np.dtype(np.float32)
+            columns.append({"name": column, "dtype": dtype.str})
+        else:
+            frequent = stats.frequent[column]
+            if not frequent.exact:
+                raise ValueError(f"Column {column!r} has too many distinct values to store as a category")
+            categories = sorted(str(value) for value in frequent.counts)
+            codes = integer_dtype(-1, len(categories))
+            columns.append({"name": column, "dtype": codes.str, "categories": categories})
+    return columns
+
+
+def _encode(series, column):
+    if "categories" in column:
+        return pd.Categorical(series.astype("string"), categories=column["categories"]).codes
+    return series.to_numpy()
+
+
+def ingest_csv(csv_path, out_path=None, fingerprint=None, chunk_rows=CHUNK_ROWS):
+    from resources import file_fingerprint
+
+    out_path = out_path or columnar_path(csv_path)
+    stats = StreamingStats.from_csv(csv_path, chunk_rows=chunk_rows)
+    columns = infer_schema(stats)
+
+    tmp_path = f"{out_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    arrays = [
+        np.lib.format.open_memmap(os.path.join(tmp_path, f"{i:03d}.npy"), mode="w+",
+                                  dtype=np.dtype(column["dtype"]), shape=(stats.rows,))
+        for i, column in enumerate(columns)
+    ]
+    start = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        stop = start + len(chunk)
+        for array, column in zip(arrays, columns):
+            array[start:stop] = _encode(chunk[column["name"]], column)
+        start = stop
+    for array in arrays:
+        array.flush()
+    del arrays
+
+    schema = {
+        "rows": stats.rows,
+        "columns": columns,
+        "source": os.path.basename(csv_path),
+        "source_fingerprint": fingerprint or file_fingerprint(csv_path),
+    }
+    with open(os.path.join(tmp_path, SCHEMA_FILE), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    shutil.rmtree(out_path, ignore_errors=True)
+    os.replace(tmp_path, out_path)
+    return schema
+
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        return json.load(f)
+
+
+def load_columnar(path):
+    schema = read_schema(path)
+    data = {}
+    for i, column in enumerate(schema["columns"]):
+        values = np.load(os.path.join(path, f"{i:03d}.npy"), mmap_mode="r")
+        if "categories" in column:
+            values = pd.Categorical.from_codes(values, categories=column["categories"])
+        data[column["name"]] = values
+    df = pd.DataFrame(data, copy=False)
+    df.attrs["fingerprint"] = schema["source_fingerprint"]
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV dataset into the memory-mapped columnar format.")
+    parser.add_argument("csv", help="CSV file to convert")
+    parser.add_argument("--out", help="Output directory (default: <csv name>.columns)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    schema = ingest_csv(args.csv, args.out, chunk_rows=args.chunk_size)
+    print(f"Wrote {schema['rows']} rows x {len(schema['columns'])} columns to "
+          f"{args.out or columnar_path(args.csv)} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
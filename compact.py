@@ -0,0 +1,287 @@
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from flat_forest import ARRAYS, FlatForest
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS
+
+# Compaction of the RandomForest into smaller FlatForest variants: fewer
+# trees, depth-pruned trees (internal nodes at the cut become leaves holding
+# their own class distribution), and quantized storage where thresholds
+# become int16 on a per-feature fixed-point grid, leaf probabilities become
+# uint8 and node arrays use the narrowest integer dtypes. Each variant is
+# scored for accuracy, agreement with the full forest, load time, memory and
+# single-row latency, so a deployment can pick its own size/accuracy point.
+#
+#   python compact.py
+#   python compact.py --trees 50 25 10 --depth 0 8 5 --out artifacts/compact
+
+OUT_DIR = os.path.join("artifacts", "compact")
+# Candidate fixed-point scales; a feature takes the first one that puts every threshold on an integer
+SCALES = (1, 2, 10, 20, 100, 200, 1000, 2000)
+THRESHOLD_MAX = np.iinfo(np.int16).max
+VALUE_SCALE = 255
+LATENCY_REPEATS = 300
+
+
+def _int_dtype(low, high):
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class CompactForest(FlatForest):
+    # FlatForest over quantized arrays: inputs are mapped onto each feature's
+    # fixed-point grid (ceil(x * scale)), which reproduces sklearn exactly for
+    # inputs on the grid of the training data
+
+    def __init__(self, feature, threshold, left, right, value, roots, missing_left, classes, feature_names,
+                 max_depth, scale, children=None, is_leaf=None):
+        super().__init__(feature, threshold, left, right, value, roots, missing_left, classes, feature_names,
+                         max_depth, children, is_leaf)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @property
+    def nbytes(self):
+        return super().nbytes + self.scale.nbytes
+
+    @classmethod
+    def from_forest(cls, forest):
+        scale = np.ones(len(forest.feature_names_in_))
+        internal = ~forest._is_leaf
+        for i in range(len(scale)):
+            thresholds = forest.threshold[internal & (forest.feature == i)]
+            for candidate in SCALES:
+                scaled = thresholds * candidate
+                if np.allclose(scaled, np.round(scaled), rtol=0, atol=1e-4):
+                    scale[i] = candidate
+                    break
+            else:
+                # Thresholds off every grid: fall back to the finest one (approximate)
+                scale[i] = SCALES[-1]
+            # Refine while int16 still holds the largest threshold: off-grid inputs (a 0.01-step
+            # slider on a 0.1-grid feature) then only differ from sklearn within 1/scale of a
+            # threshold that sklearn placed on a data value
+            largest = np.abs(thresholds).max() if thresholds.size else 0
+            while largest * scale[i] * 10 <= THRESHOLD_MAX:
+                scale[i] *= 10
+        node_scale = scale[forest.feature]
+        threshold = np.where(internal, np.round(forest.threshold * node_scale), 0)
+        # sklearn keeps a threshold one float32 step below a data value when the midpoint rounds up
+        # to it; inputs on that grid point must still go right, so shift those down a step
+        below = internal & ((threshold / node_scale).astype(np.float32) > forest.threshold)
+        threshold = threshold - below
+        node_dtype = _int_dtype(0, len(forest.left))
+        return cls(
+            feature=forest.feature.astype(_int_dtype(0, len(scale))),
+            threshold=threshold.astype(_int_dtype(threshold.min(), threshold.max())),
+            left=forest.left.astype(node_dtype),
+            right=forest.right.astype(node_dtype),
+            value=np.round(forest.value * VALUE_SCALE).astype(np.uint8),
+            roots=forest.roots.astype(node_dtype),
+            missing_left=forest.missing_left,
+            classes=forest.classes_,
+            feature_names=forest.feature_names_in_,
+            max_depth=forest.max_depth,
+            scale=scale,
+        )
+
+    def save(self, path):
+        super().save(path, scale=self.scale)
+
+    def _as_matrix(self, X):
+        X = super()._as_matrix(X).astype(np.float64) * self.scale
+        # Rounding first absorbs float32 noise (1.6f * 20 = 32.0000005) before taking the ceiling;
+        # grid values stay float64 (exact integers) so missing values remain NaN
+        return np.ceil(np.round(X, 3))
+
+    def predict_proba(self, X):
+        proba = super().predict_proba(X)
+        # Quantized leaf probabilities no longer sum to exactly one
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+def load_forest(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in ARRAYS}
+        meta = {"classes": data["classes"], "feature_names": data["feature_names"], "max_depth": data["max_depth"]}
+        if "scale" in data:
+            return CompactForest(scale=data["scale"], **meta, **arrays)
+    return FlatForest(**meta, **arrays)
+
+
+def _subset(forest, keep, left=None, right=None):
+    # Rebuild the forest from the nodes in `keep`, renumbering child and root indexes
+    left = forest.left if left is None else left
+    right = forest.right if right is None else right
+    new_index = np.cumsum(keep) - 1
+    return FlatForest(
+        feature=forest.feature[keep],
+        threshold=forest.threshold[keep],
+        left=new_index[left[keep]].astype(forest.left.dtype),
+        right=new_index[right[keep]].astype(forest.right.dtype),
+        value=forest.value[keep],
+        roots=new_index[forest.roots[keep[forest.roots]]].astype(forest.roots.dtype),
+        missing_left=forest.missing_left[keep],
+        classes=forest.classes_,
+        feature_names=forest.feature_names_in_,
+        max_depth=forest.max_depth,
+    )
+
+
+def select_trees(forest, n_trees):
+    # Trees are independent bootstrap fits, so the first n are as good a sample as any
+    if n_trees >= forest.n_estimators:
+        return forest
+    return _subset(forest, np.arange(len(forest.left)) < forest.roots[n_trees])
+
+
+def node_depths(forest):
+    depth = np.full(len(forest.left), -1)
+    frontier = forest.roots.astype(np.intp)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        frontier = frontier[~forest._is_leaf[frontier]]
+        frontier = np.concatenate([forest.left[frontier], forest.right[frontier]]).astype(np.intp)
+        level += 1
+    return depth
+
+
+def prune_depth(forest, max_depth):
+    if not max_depth or max_depth >= forest.max_depth:
+        return forest
+    depth = node_depths(forest)
+    node_ids = np.arange(len(forest.left))
+    cut = depth == max_depth
+    left = np.where(cut, node_ids, forest.left)
+    right = np.where(cut, node_ids, forest.right)
+    pruned = _subset(forest, (depth >= 0) & (depth <= max_depth), left, right)
+    pruned.max_depth = max_depth
+    return pruned
+
+
+def build_variant(forest, n_trees=None, max_depth=None, quantize=False):
+    variant = prune_depth(select_trees(forest, n_trees or forest.n_estimators), max_depth)
+    return CompactForest.from_forest(variant) if quantize else variant
+
+
+LOAD_CHILD = r"""
+import json, sys, time
+import joblib
+from compact import load_forest
+
+def rss_kib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+load = load_forest if sys.argv[1].endswith(".npz") else joblib.load
+before = rss_kib()
+start = time.perf_counter()
+model = load(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps({"load_seconds": seconds, "resident_bytes": (rss_kib() - before) * 1024}))
+"""
+
+
+def _load_measured(path):
+    # Load in a fresh interpreter, so load time is a cold start and the RSS delta is the model's own
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", LOAD_CHILD, os.path.abspath(path)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _median_seconds(fn, repeats=LATENCY_REPEATS):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def evaluate(name, path, load, X_test, y_test, X_all, reference):
+    model = load(path)
+    measured = _load_measured(path)
+    proba = model.predict_proba(X_all)
+    positive = list(model.classes_).index(POSITIVE_CLASS)
+    row = X_test.iloc[[0]]
+    return {
+        "variant": name,
+        "trees": int(getattr(model, "n_estimators", 0)),
+        "max_depth": int(getattr(model, "max_depth", 0) or max(e.tree_.max_depth for e in model.estimators_)),
+        "file_bytes": os.path.getsize(path),
+        "resident_bytes": measured["resident_bytes"],
+        # Node arrays plus the evaluator's runtime index arrays (the RSS delta is page-granular)
+        "array_bytes": model.nbytes + model._children.nbytes + model._is_leaf.nbytes if isinstance(model, FlatForest) else None,
+        "load_ms": measured["load_seconds"] * 1000,
+        "latency_row_ms": _median_seconds(lambda: model.predict_proba(row)) * 1000,
+        "test_accuracy": float((model.predict(X_test) == y_test.to_numpy()).mean()),
+        "agreement": float((proba.argmax(axis=1) == reference.argmax(axis=1)).mean()),
+        "max_risk_diff": float(np.abs(proba[:, positive] - reference[:, positive]).max()),
+    }
+
+
+def compact(model_path=MODEL_PATH, data_path=DATA_PATH, trees=(50, 25, 10), depths=(0, 8, 5), out_dir=OUT_DIR):
+    model = joblib.load(model_path)
+    df = pd.read_csv(data_path)
+    X, y = df.iloc[:, :-1], df.iloc[:, -1]
+    # The notebook's split, so the test rows are the ones the shipped forest did not train on
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=128)
+    reference = model.predict_proba(X)
+    forest = FlatForest.from_model(model)
+
+    os.makedirs(out_dir, exist_ok=True)
+    results = [evaluate("sklearn", model_path, joblib.load, X_test, y_test, X, reference)]
+    for n_trees, max_depth, quantize in itertools.product(trees, depths, (False, True)):
+        if n_trees > forest.n_estimators:
+            continue
+        name = f"forest-t{n_trees}-d{max_depth or 'full'}{'-q' if quantize else ''}"
+        path = os.path.join(out_dir, f"{name}.npz")
+        build_variant(forest, n_trees, max_depth, quantize).save(path)
+        results.append(evaluate(name, path, load_forest, X_test, y_test, X, reference))
+
+    baseline = results[0]["test_accuracy"]
+    for result in results:
+        result["accuracy_drop"] = baseline - result["test_accuracy"]
+    with open(os.path.join(out_dir, "report.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and compare pruned/quantized forest variants.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled RandomForest to compact")
+    parser.add_argument("--data", default=DATA_PATH, help="Labelled CSV used for accuracy and agreement")
+    parser.add_argument("--trees", type=int, nargs="+", default=[50, 25, 10])
+    parser.add_argument("--depth", type=int, nargs="+", default=[0, 8, 5], help="Depth limits (0 keeps full depth)")
+    parser.add_argument("--out", default=OUT_DIR, help="Directory for the .npz variants and report.json")
+    args = parser.parse_args(argv)
+
+    results = compact(args.model, args.data, args.trees, args.depth, args.out)
+    print(f"{'variant':<22}{'trees':>6}{'depth':>6}{'file KiB':>10}{'rss KiB':>9}{'arrays KiB':>11}{'load ms':>9}"
+          f"{'row ms':>8}{'acc':>7}{'drop':>7}{'agree':>7}", file=sys.stderr)
+    for r in results:
+        arrays = f"{r['array_bytes'] / 1024:>11.1f}" if r["array_bytes"] is not None else f"{'-':>11}"
+        print(f"{r['variant']:<22}{r['trees']:>6}{r['max_depth']:>6}{r['file_bytes'] / 1024:>10.1f}"
+              f"{r['resident_bytes'] / 1024:>9.0f}{arrays}{r['load_ms']:>9.2f}{r['latency_row_ms']:>8.3f}"
+              f"{r['test_accuracy']:>7.3f}{r['accuracy_drop']:>7.3f}{r['agreement']:>7.3f}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import collections
+import threading
+
+import pandas as pd
+
+from hist_cube import ColumnCube, JointCube
+from range_index import RangeFilter, page_count, page_slice
+
+# Read-only view of the shared dataset handed to every page. Column buffers
+# are frozen (writeable=False), the numeric/categorical partitions are built
+# once per dataset, and range filters go through sorted column indexes with
+# their results cached, so reruns neither copy nor mutate the frame that all
+# sessions share.
+
+MAX_CACHED_QUERIES = 64
+PAGE_SIZE = 25
+
+
+def _freeze(series):
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        codes = _frozen_array(values.codes)
+        return pd.Categorical.from_codes(codes, dtype=values.dtype, validate=False)
+    return _frozen_array(series.to_numpy())
+
+
+def _frozen_array(values):
+    if values.flags.writeable:
+        values = values.copy()
+        values.setflags(write=False)
+    return values
+
+
+def _frozen_frame(df):
+    frozen = pd.DataFrame({column: _freeze(df[column]) for column in df.columns}, index=df.index, copy=False)
+    frozen.attrs.update(df.attrs)
+    return frozen
+
+
+class DatasetView:
+    def __init__(self, df):
+        self._df = _frozen_frame(df)
+        self.fingerprint = df.attrs.get("fingerprint")
+        self.columns = tuple(self._df.columns)
+        self.numeric_columns = tuple(self._df.select_dtypes(include=["number"]).columns)
+        self.categorical_columns = tuple(self._df.select_dtypes(include=["object", "category"]).columns)
+        self._numeric = self._df[list(self.numeric_columns)]
+        self._index = None
+        self._cubes = {}
+        self._queries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._df)
+
+    @property
+    def frame(self):
+        # A new frame object over the same frozen buffers: pages can add columns
+        # to it or rebind it without touching what other sessions see
+        return self._df.copy(deep=False)
+
+    @property
+    def numeric(self):
+        return self._numeric.copy(deep=False)
+
+    @property
+    def index(self):
+        # Sorted indexes over the numeric columns, built on the first filter
+        with self._lock:
+            if self._index is None:
+                self._index = RangeFilter(self._df, self.numeric_columns)
+            return self._index
+
+    def histogram(self, column):
+        # Pre-aggregated counts and KDE for the bins sliders, built once per column
+        return self._cube(column, lambda: ColumnCube(self._df[column].to_numpy(dtype=float)))
+
+    def joint(self, x, y):
+        return self._cube((x, y), lambda: JointCube(self._df[x].to_numpy(dtype=float), self._df[y].to_numpy(dtype=float)))
+
+    def _cube(self, key, build):
+        with self._lock:
+            cube = self._cubes.get(key)
+        if cube is None:
+            cube = build()
+            with self._lock:
+                cube = self._cubes.setdefault(key, cube)
+        return cube
+
+    def rows(self, ranges):
+        # ranges: {column: (low, high)}, inclusive on both ends; returns row positions
+        key = tuple(sorted(ranges.items()))
+        with self._lock:
+            cached = self._queries.get(key)
+            if cached is not None:
+                self._queries.move_to_end(key)
+                return cached
+        rows = self.index.rows(ranges)
+        rows.setflags(write=False)
+        with self._lock:
+            self._queries[key] = rows
+            while len(self._queries) > MAX_CACHED_QUERIES:
+                self._queries.popitem(last=False)
+        return rows
+
+    def extent(self, column):
+        # Slider bounds: (min, max) of a numeric column from its sorted index
+        return self.index.indexes[column].extent()
+
+    def filter(self, ranges):
+        return self._df.iloc[self.rows(ranges)]
+
+    def take(self, rows):
+        return self._df.iloc[rows]
+
+
+def show_rows(container, view, rows, key, page_size=PAGE_SIZE):
+    # Paginated preview of filtered rows: only the current page is materialized
+    pages = page_count(len(rows), page_size)
+    container.write(f"{len(rows):,} of {len(view):,} rows")
+    page = 1
+    if pages > 1:
+        # Keyed on the page count, so narrowing the filter starts again from page 1
+        page = int(container.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1,
+                                          key=f"{key}_{pages}"))
+    container.dataframe(view.take(rows[page_slice(page, page_size)]))
+
+
+def as_view(data):
+    return data if isinstance(data, DatasetView) else DatasetView(data)
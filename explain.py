@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from prediction_cache import PredictionCache, canonical_key
+from resources import POSITIVE_CLASS
+
+# Exact path-dependent TreeSHAP for the RandomForest, vectorized across rows.
+# Every tree is decomposed into its root-to-leaf paths; repeated features on
+# a path are merged (bounds intersected, cover fractions multiplied). For a
+# path with d distinct features, the Shapley contribution to each feature is
+# the leaf value times an "unwound" sum over the path's permutation weights,
+# which depend only on the cover fractions and on whether each row satisfies
+# each bound. Since a row either satisfies a bound or not, a path has only
+# 2^d distinct outcomes: for paths up to MAX_TABLE_DEPTH these are computed
+# once per model (the O(d^2) weight recursion, as NumPy operations over all
+# paths of the same d at once), and explaining a row is a table lookup per
+# path. Tables grow as P * 2^d * d, so they are built shallowest depth first
+# only while their total stays within MAX_TABLE_BYTES (forests fit on more
+# rows have more and deeper paths); deeper paths, and any past the budget,
+# run the same recursion per row.
+#
+# Contributions are on the positive-class probability: for every row,
+# expected_value + contributions.sum() equals the forest's risk.
+
+MAX_CHUNK_ELEMENTS = 4_000_000
+MAX_TABLE_DEPTH = 12
+MAX_TABLE_BYTES = 128 * 1024 * 1024
+
+
+class TreeExplainer:
+    def __init__(self, groups, expected_value, feature_names):
+        # groups: {d: (feature (P, d), lower (P, d), upper (P, d), zero (P, d), value (P,), table)}
+        # table[p, pattern] holds path p's contributions for each bound-satisfaction pattern
+        self.groups = groups
+        self.expected_value = float(expected_value)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    @classmethod
+    def from_model(cls, model, positive_class=POSITIVE_CLASS, max_table_bytes=MAX_TABLE_BYTES):
+        positive = list(model.classes_).index(positive_class)
+        paths = []
+        for estimator in model.estimators_:
+            paths.extend(_tree_paths(estimator.tree_, positive, len(model.estimators_)))
+        expected_value = sum(value * np.prod(zero) for _, _, _, zero, value in paths)
+
+        groups = {}
+        table_bytes = 0
+        for depth in sorted({len(path[0]) for path in paths}):
+            members = [path for path in paths if len(path[0]) == depth]
+            shape = (len(members), depth)
+            groups[depth] = (
+                np.array([member[0] for member in members], dtype=np.intp).reshape(shape),
+                np.array([member[1] for member in members], dtype=np.float64).reshape(shape),
+                np.array([member[2] for member in members], dtype=np.float64).reshape(shape),
+                np.array([member[3] for member in members], dtype=np.float64).reshape(shape),
+                np.array([member[4] for member in members], dtype=np.float64),
+            )
+            # Shallow tables save the most per byte (lookup vs O(d^2) per row, for 2^d * d entries)
+            size = len(members) * (1 << depth) * depth * 8
+            tabled = depth <= MAX_TABLE_DEPTH and table_bytes + size <= max_table_bytes
+            table_bytes += size if tabled else 0
+            groups[depth] += (_outcome_table(groups[depth][3], groups[depth][4]) if tabled else None,)
+        feature_names = getattr(model, "feature_names_in_", np.arange(model.n_features_in_))
+        return cls(groups, expected_value, feature_names)
+
+    def _as_matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)]
+        # Same float32 comparison against float64 thresholds as sklearn's trees
+        X = np.asarray(X, dtype=np.float32)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def shap_values(self, X):
+        X = self._as_matrix(X)
+        n_rows, n_features = X.shape
+        phi = np.zeros((n_rows, n_features))
+        for depth, (feature, lower, upper, zero, value, table) in self.groups.items():
+            if depth == 0:
+                continue
+            bits = 1 << np.arange(depth)
+            step = max(1, MAX_CHUNK_ELEMENTS // (len(value) * (depth + 1)))
+            for start in range(0, n_rows, step):
+                rows = X[start:start + step]
+                x = rows[:, feature]
+                one = (x > lower) & (x <= upper)
+                if table is not None:
+                    contribution = table[np.arange(len(value)), one @ bits]
+                else:
+                    contribution = _path_shap(one.astype(np.float64), zero) * value[:, None]
+                flat = (np.arange(len(rows))[:, None, None] * n_features + feature).ravel()
+                phi[start:start + step] += np.bincount(flat, contribution.ravel(),
+                                                       minlength=len(rows) * n_features).reshape(len(rows), n_features)
+        return phi
+
+    def risk(self, X):
+        return self.expected_value + self.shap_values(X).sum(axis=1)
+
+
+def _tree_paths(tree, positive, n_trees):
+    # (features, lower, upper, zero fractions, leaf value) for each leaf, with repeated features merged
+    cover = tree.weighted_n_node_samples
+    value = tree.value[:, 0, :]
+    value = value[:, positive] / value.sum(axis=1) / n_trees
+    paths = []
+    stack = [(0, {})]
+    while stack:
+        node, bounds = stack.pop()
+        left, right = tree.children_left[node], tree.children_right[node]
+        if left == -1:
+            features = sorted(bounds)
+            paths.append((
+                features,
+                [bounds[f][0] for f in features],
+                [bounds[f][1] for f in features],
+                [bounds[f][2] for f in features],
+                value[node],
+            ))
+            continue
+        feature, threshold = int(tree.feature[node]), tree.threshold[node]
+        lower, upper, zero = bounds.get(feature, (-np.inf, np.inf, 1.0))
+        for child, child_lower, child_upper in ((left, lower, min(upper, threshold)), (right, max(lower, threshold), upper)):
+            child_bounds = dict(bounds)
+            child_bounds[feature] = (child_lower, child_upper, zero * cover[child] / cover[node])
+            stack.append((child, child_bounds))
+    return paths
+
+
+def _outcome_table(zero, value):
+    # (P, 2^d, d) contributions of every path for every pattern of satisfied bounds
+    n_paths, depth = zero.shape
+    patterns = (np.arange(1 << depth)[:, None] >> np.arange(depth)) & 1
+    table = np.empty((n_paths, len(patterns), depth))
+    step = max(1, MAX_CHUNK_ELEMENTS // (n_paths * (depth + 1)))
+    for start in range(0, len(patterns), step):
+        one = np.broadcast_to(patterns[start:start + step, None, :], (len(patterns[start:start + step]), n_paths, depth))
+        table[:, start:start + step] = (_path_shap(one.astype(np.float64), zero) * value[:, None]).transpose(1, 0, 2)
+    return table
+
+
+def _path_shap(one, zero):
+    # one: (R, P, d) 0/1 fractions, zero: (P, d) cover fractions -> (R, P, d) unwound sums * (one - zero)
+    n_rows, n_paths, depth = one.shape
+    # EXTEND: permutation weights after adding the bias element, then each path element in turn
+    weights = np.zeros((n_rows, n_paths, depth + 1))
+    weights[..., 0] = 1.0
+    k = np.arange(depth + 1)
+    for i in range(1, depth + 1):
+        z = zero[None, :, i - 1, None]
+        o = one[:, :, i - 1, None]
+        shifted = np.concatenate([np.zeros((n_rows, n_paths, 1)), weights[..., :-1]], axis=2)
+        weights = (z * weights * np.clip(i - k, 0, None) + o * shifted * k) / (i + 1)
+
+    # UNWOUND_PATH_SUM for every element at once
+    l = depth
+    z = np.broadcast_to(zero[None], one.shape)
+    total = np.zeros(one.shape)
+    next_one = np.broadcast_to(weights[..., l, None], one.shape).copy()
+    is_one = one != 0
+    safe_one = np.where(is_one, one, 1.0)
+    for j in range(l - 1, -1, -1):
+        w = weights[..., j, None]
+        tmp = next_one * (l + 1) / ((j + 1) * safe_one)
+        total += np.where(is_one, tmp, w / (z * (l - j) / (l + 1)))
+        next_one = w - tmp * z * (l - j) / (l + 1)
+    return total * (one - z)
+
+
+explanation_cache = PredictionCache()
+
+
+def explain_section(explainer, input_df, fingerprint=None):
+    import altair as alt
+
+    contributions = explanation_cache.get_or_compute(
+        canonical_key(input_df, explainer.feature_names_in_),
+        lambda: explainer.shap_values(input_df)[0],
+        fingerprint=fingerprint,
+    )
+    frame = pd.DataFrame({
+        "Feature": explainer.feature_names_in_,
+        "Value": input_df.iloc[0][list(explainer.feature_names_in_)].to_numpy(),
+        "Contribution": contributions,
+    })
+    frame["Direction"] = np.where(frame["Contribution"] >= 0, "Raises risk", "Lowers risk")
+    chart = alt.Chart(frame).mark_bar().encode(
+        x=alt.X("Contribution", type="quantitative", title="Change in risk"),
+        y=alt.Y("Feature", type="nominal", sort="-x"),
+        color=alt.Color("Direction", scale=alt.Scale(domain=["Raises risk", "Lowers risk"], range=["#e74c3c", "#1abc9c"])),
+        tooltip=["Feature", "Value", alt.Tooltip("Contribution", format="+.3f")],
+    )
+    st.altair_chart(chart, width="stretch")
+    st.caption(f"Average risk across the training data is {explainer.expected_value:.2f}; "
+               f"these contributions move it to {explainer.expected_value + contributions.sum():.2f} for this patient.")
@@ -0,0 +1,253 @@
+import collections
+import contextlib
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+import streamlit as st
+from cycler import cycler
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from perf import span
+
+# Rendered-figure cache shared by the Visualize / Analyze / Insights pages.
+# Figures are stored as encoded PNG/SVG bytes keyed by everything that affects
+# the drawing (plot type, columns, bins, KDE flag, palette, dataset
+# fingerprint), with least-recently-used eviction once the byte budget is hit.
+#
+# Inside page_figures() (how app.py runs the chart pages), show_figure()
+# leaves a placeholder and renders on a thread pool, so the page's tables and
+# widgets appear first and each figure fills in as it finishes. matplotlib's
+# pyplot registry and rcParams are process-global, so drawing and encoding
+# run under one lock with the page's theme applied via rc_context (set_theme()
+# records the theme per thread instead of changing the global style); savefig
+# reads rcParams too (padding, face colour, text and path settings), so a PNG
+# encoded outside the lock could pick up another page's theme. A figure already
+# being rendered (by another session or by prefetch.py) is waited on, not redrawn.
+#
+# PNGs are encoded at most DISPLAY_WIDTH pixels wide (the dpi is lowered for
+# wide figures), so st.image passes cached bytes through instead of decoding,
+# resizing and re-encoding them on every rerun.
+
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+# Streamlit's widest image (2 x its 730 px content column), as in assets.py
+DISPLAY_WIDTH = 1460
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+figure_cache = FigureCache()
+
+
+def dataset_fingerprint(df):
+    # Datasets from resources.load_dataset carry their file hash; hash anything else
+    fingerprint = df.attrs.get("fingerprint")
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        fingerprint = digest.hexdigest()
+    return fingerprint
+
+
+_draw_lock = threading.RLock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_local = threading.local()
+_pool = ThreadPoolExecutor(RENDER_WORKERS, thread_name_prefix="figure")
+
+
+def theme_rc(style="darkgrid", context="notebook", palette="deep"):
+    # The rcParams sns.set_theme() would apply, without applying them
+    rc = dict(sns.plotting_context(context))
+    rc.update(sns.axes_style(style, rc={"font.family": "sans-serif"}))
+    rc["axes.prop_cycle"] = cycler("color", sns.color_palette(palette))
+    return rc
+
+
+def set_theme(**kwargs):
+    # Theme for the figures this thread's page renders next
+    _local.theme = theme_rc(**kwargs)
+
+
+def _display_dpi(fig):
+    # The dpi that puts the tight-cropped figure (plus savefig's padding) at DISPLAY_WIDTH at most
+    # (closed figures have a bare canvas; savefig would attach an Agg one for PNG anyway)
+    renderer = FigureCanvasAgg(fig).get_renderer()
+    width = fig.get_tightbbox(renderer).width + 2 * mpl.rcParams["savefig.pad_inches"]
+    return min(SAVEFIG_OPTIONS["dpi"], int(DISPLAY_WIDTH / width))
+
+
+def _fit_display_width(data):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    if image.width <= DISPLAY_WIDTH:
+        return data
+    # Rounding in the tight crop can leave a pixel or two over; resize once here rather than per rerun
+    image = image.resize((DISPLAY_WIDTH, round(image.height * DISPLAY_WIDTH / image.width)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def figure_to_bytes(fig, fmt="png"):
+    # Encodes with the rcParams in effect for the caller (see _render), hence under the lock.
+    # Drop the figure from pyplot's global registry so reruns don't accumulate figures
+    buffer = io.BytesIO()
+    with _draw_lock:
+        plt.close(fig)
+        if fmt != "png":
+            fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+            return buffer.getvalue()
+        fig.savefig(buffer, format=fmt, **dict(SAVEFIG_OPTIONS, dpi=_display_dpi(fig)))
+    return _fit_display_width(buffer.getvalue())
+
+
+def _render(key, draw, rc):
+    # Spans are per plot type: drawing (matplotlib/seaborn) and encoding (savefig) separately
+    name = "/".join(map(str, key[1:3]))
+    with _draw_lock, mpl.rc_context(rc):
+        with span(f"figure/{name}/draw"):
+            fig = draw()
+        with span(f"figure/{name}/encode"):
+            data = figure_to_bytes(fig, key[0])
+    figure_cache.put(key, data)
+    return data
+
+
+def _finished(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def submit_figure(key, draw, fmt="png", executor=_pool):
+    # Future for the figure's bytes; with executor=None the render runs on the calling thread
+    key = (fmt,) + tuple(key)
+    future = Future()
+    data = figure_cache.get(key)
+    if data is not None:
+        future.set_result(data)
+        return future
+    with _inflight_lock:
+        running = _inflight.get(key)
+        if running is not None:
+            return running
+        if executor is not None:
+            future = executor.submit(_render, key, draw, getattr(_local, "theme", None))
+        _inflight[key] = future
+    future.add_done_callback(lambda done: _finished(key, done))
+    if executor is None:
+        try:
+            future.set_result(_render(key, draw, getattr(_local, "theme", None)))
+        except BaseException as error:
+            future.set_exception(error)
+    return future
+
+
+def render_figure(key, draw, fmt="png"):
+    return submit_figure(key, draw, fmt, executor=None).result()
+
+
+def _show(container, data, fmt):
+    if fmt == "svg":
+        container.image(data.decode("utf-8"), width="stretch")
+    else:
+        container.image(data, width="stretch", output_format="PNG")
+
+
+@contextlib.contextmanager
+def page_figures(deferred=True):
+    # One page render: the theme starts from matplotlib's defaults, and when deferred, figures
+    # shown inside the block render concurrently and fill their placeholders once it is done
+    pending = {} if deferred else None
+    _local.theme = None
+    _local.pending = pending
+    try:
+        yield
+    finally:
+        _local.theme = None
+        _local.pending = None
+    if not pending:
+        return
+    for future in as_completed(pending):
+        # A figure that failed to render shows its error; the rest still fill in
+        error = future.exception()
+        for placeholder, fmt in pending[future]:
+            if error is not None:
+                placeholder.error(f"Could not render figure: {error}")
+            else:
+                _show(placeholder, future.result(), fmt)
+
+
+def show_figure(key, draw, fmt="png"):
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        _show(st, render_figure(key, draw, fmt), fmt)
+        return
+    future = submit_figure(key, draw, fmt)
+    if future.done() and future.exception() is None:
+        _show(st, future.result(), fmt)
+        return
+    placeholder = st.empty()
+    placeholder.caption("⏳ Rendering figure...")
+    pending.setdefault(future, []).append((placeholder, fmt))
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# Flattened RandomForest: every tree's nodes live in contiguous NumPy arrays
+# (feature, threshold, left/right child, class probabilities) and are walked
+# for all rows and all trees at once. Leaves point back at themselves, and
+# (row, tree) pairs drop out of the walk as soon as they reach a leaf.
+# Missing values (NaN) follow each split's missing_go_to_left like sklearn;
+# infinite values are rejected, as sklearn's input validation does.
+
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "missing_left")
+CHUNK_ROWS = 65_536
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, left, right, value, roots, missing_left, classes, feature_names,
+                 max_depth, children=None, is_leaf=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.missing_left = missing_left
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.max_depth = int(max_depth)
+        # Interleaved children so one gather picks left/right by the comparison result
+        # (derived arrays can be passed in precomputed, e.g. memory-mapped by shared_model.py)
+        self._children = np.stack([left, right], axis=1).ravel().astype(np.intp) if children is None else children
+        self._is_leaf = left == np.arange(len(left)) if is_leaf is None else is_leaf
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    @classmethod
+    def from_model(cls, model):
+        features, thresholds, lefts, rights, values, roots, missing_lefts = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+            value = tree.value[:, 0, :]
+            value = value / value.sum(axis=1, keepdims=True)
+            # Where NaN goes at each split (trees from sklearn < 1.3 have no missing-value support)
+            missing_left = getattr(tree, "missing_go_to_left", np.zeros(n_nodes, dtype=np.uint8))
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            missing_lefts.append(np.asarray(missing_left, dtype=bool) & ~is_leaf)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        index_dtype = np.int32 if offset < np.iinfo(np.int32).max else np.int64
+        feature_names = getattr(model, "feature_names_in_", np.arange(model.n_features_in_))
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(index_dtype),
+            right=np.concatenate(rights).astype(index_dtype),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=index_dtype),
+            missing_left=np.concatenate(missing_lefts),
+            classes=model.classes_,
+            feature_names=feature_names,
+            max_depth=max_depth,
+        )
+
+    def save(self, path, **extra):
+        np.savez(
+            path,
+            classes=self.classes_.astype(str),
+            feature_names=self.feature_names_in_.astype(str),
+            max_depth=self.max_depth,
+            **{name: getattr(self, name) for name in ARRAYS},
+            **extra,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                classes=data["classes"],
+                feature_names=data["feature_names"],
+                max_depth=data["max_depth"],
+                **{name: data[name] for name in ARRAYS},
+            )
+
+    def _as_matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)]
+        # sklearn compares float32 inputs against float64 thresholds; do the same for exact parity
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        return X
+
+    def _leaves(self, X):
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_X = X.ravel()
+        node = np.tile(self.roots.astype(np.intp), n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        active = np.flatnonzero(~self._is_leaf[node])
+        has_missing = np.isnan(flat_X).any()
+        while active.size:
+            current = node[active]
+            x = flat_X[row_offset[active] + self.feature[current]]
+            go_right = x > self.threshold[current]
+            if has_missing:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.missing_left[current[missing]]
+            node[active] = current = self._children[2 * current + go_right]
+            active = active[~self._is_leaf[current]]
+        return node.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X):
+        X = self._as_matrix(X)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaves = self._leaves(X[start:start + CHUNK_ROWS])
+            proba[start:start + CHUNK_ROWS] = self.value[leaves].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def is_tree_ensemble(model):
+    estimators = getattr(model, "estimators_", None)
+    return isinstance(estimators, list) and bool(estimators) and all(hasattr(e, "tree_") for e in estimators)
+
+
+def as_predictor(model):
+    # Forests get the flat evaluator; anything else is used as-is
+    return FlatForest.from_model(model) if is_tree_ensemble(model) else model
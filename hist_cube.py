@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# Pre-aggregated histograms for the bin-count sliders. Each column is reduced
+# once to counts over its distinct values (exact) or, for columns with more
+# distinct values than MAX_SUPPORT, over a fine grid of MAX_SUPPORT bins. Any
+# bins= slider value is then a re-binning of those counts, and the KDE
+# overlay is evaluated once on a fixed grid and rescaled per bin width, so
+# slider ticks cost O(bins + support) regardless of the row count. With exact
+# support the counts match np.histogram on the raw column bin for bin.
+#
+# JointCube does the same for a pair of columns, which is what the Insights
+# "Age by Cholesterol bin" box plot needs: age quantiles per cholesterol bin
+# are read off cumulative counts instead of the raw rows.
+
+MAX_SUPPORT = 65536
+JOINT_SUPPORT = 512
+KDE_GRID = 200
+
+
+def _support(values, max_support):
+    # (points, counts, exact) summarising values without NaNs
+    points, counts = np.unique(values, return_counts=True)
+    if len(points) <= max_support:
+        return points.astype(float), counts, True
+    counts, edges = np.histogram(values, bins=max_support)
+    return (edges[:-1] + edges[1:]) / 2, counts, False
+
+
+def _support_index(values, points, exact):
+    if exact:
+        return np.searchsorted(points, values)
+    width = points[1] - points[0]
+    return np.clip(np.floor((values - points[0]) / width + 0.5), 0, len(points) - 1).astype(np.intp)
+
+
+def weighted_quantile(points, counts, q):
+    # Linear-interpolated quantile (numpy's default) of points repeated counts times
+    total = counts.sum()
+    position = q * (total - 1)
+    cumulative = np.cumsum(counts)
+    lower = points[np.searchsorted(cumulative, np.floor(position), side="right")]
+    upper = points[np.searchsorted(cumulative, np.ceil(position), side="right")]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+
+class ColumnCube:
+    def __init__(self, values, max_support=MAX_SUPPORT, kde_grid=KDE_GRID):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.rows = len(values)
+        self.minimum = float(values.min()) if self.rows else 0.0
+        self.maximum = float(values.max()) if self.rows else 0.0
+        self.points, self.counts, self.exact = _support(values, max_support)
+        self.kde_x, self.kde_density = self._kde(values, kde_grid)
+
+    def _kde(self, values, kde_grid):
+        # Gaussian KDE with Scott's bandwidth over [min, max], as seaborn's histplot overlay
+        # (cut=0), summed over the support points instead of the rows
+        grid = np.linspace(self.minimum, self.maximum, kde_grid)
+        if self.rows < 2 or values.std() == 0:
+            return grid, np.zeros_like(grid)
+        bandwidth = values.std(ddof=1) * self.rows ** (-1 / 5)
+        density = np.zeros_like(grid)
+        for start in range(0, len(self.points), 1024):
+            points = self.points[start:start + 1024]
+            weights = self.counts[start:start + 1024]
+            z = (grid[:, None] - points[None, :]) / bandwidth
+            density += (np.exp(-0.5 * z ** 2) * weights).sum(axis=1)
+        density /= self.rows * bandwidth * np.sqrt(2 * np.pi)
+        return grid, density
+
+    def histogram(self, bins):
+        # (counts, edges) for `bins` equal-width bins over [min, max]
+        return np.histogram(self.points, bins=bins, range=(self.minimum, self.maximum), weights=self.counts)
+
+    def kde(self, bins):
+        # KDE scaled to the count axis of a `bins`-bin histogram
+        width = (self.maximum - self.minimum) / bins if self.maximum > self.minimum else 1.0
+        return self.kde_x, self.kde_density * self.rows * width
+
+
+class JointCube:
+    def __init__(self, x, y, max_support=JOINT_SUPPORT):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        present = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[present], y[present]
+        self.rows = len(x)
+        self.x_min = float(x.min()) if self.rows else 0.0
+        self.x_max = float(x.max()) if self.rows else 0.0
+        self.x_points, _, x_exact = _support(x, max_support)
+        self.y_points, _, y_exact = _support(y, max_support)
+        self.exact = x_exact and y_exact
+        # counts[i, j]: rows with x at x_points[i] and y at y_points[j]
+        self.counts = np.zeros((len(self.x_points), len(self.y_points)), dtype=np.int64)
+        np.add.at(self.counts, (_support_index(x, self.x_points, x_exact), _support_index(y, self.y_points, y_exact)), 1)
+
+    def bin_edges(self, bins):
+        # pd.cut(x, bins) only depends on the range of x, so cutting [min, max] gives its edges and labels
+        binned, edges = pd.cut([self.x_min, self.x_max], bins, retbins=True)
+        return edges, [str(interval) for interval in binned.categories]
+
+    def y_by_x_bin(self, bins):
+        # Per x bin, counts over y_points; bins are right-closed like pd.cut
+        edges, labels = self.bin_edges(bins)
+        bin_of = np.clip(np.searchsorted(edges, self.x_points, side="left") - 1, 0, bins - 1)
+        per_bin = np.zeros((bins, len(self.y_points)), dtype=np.int64)
+        np.add.at(per_bin, bin_of, self.counts)
+        return labels, per_bin
+
+    def box_stats(self, bins, whis=1.5):
+        # matplotlib bxp() statistics for y within each x bin, computed from the counts
+        labels, per_bin = self.y_by_x_bin(bins)
+        stats = []
+        for label, counts in zip(labels, per_bin):
+            present = counts > 0
+            if not present.any():
+                stats.append(None)
+                continue
+            points, counts = self.y_points[present], counts[present]
+            q1, median, q3 = (weighted_quantile(points, counts, q) for q in (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            inside = (points >= q1 - whis * iqr) & (points <= q3 + whis * iqr)
+            stats.append({
+                "label": label,
+                "q1": q1,
+                "med": median,
+                "q3": q3,
+                "whislo": points[inside].min(),
+                "whishi": points[inside].max(),
+                "fliers": points[~inside],
+                "mean": float((points * counts).sum() / counts.sum()),
+            })
+        return labels, stats
+
+
+def draw_histogram(ax, cube, bins, kde=True, color=None, edgecolor=None):
+    # Bars plus the optional KDE line, in place of sns.histplot(values, bins=bins, kde=kde)
+    counts, edges = cube.histogram(bins)
+    bars = ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color=color, edgecolor=edgecolor, alpha=0.75)
+    if kde:
+        ax.plot(*cube.kde(bins), color=bars.patches[0].get_facecolor()[:3] if bars.patches else color, linewidth=1.5)
+    ax.set_ylabel("Count")
+    return ax
+
+
+def draw_box_by_bin(ax, joint, bins, cmap="viridis"):
+    # Box per x bin, in place of sns.boxplot(x=pd.cut(x, bins), y=y)
+    from matplotlib import colormaps
+
+    labels, stats = joint.box_stats(bins)
+    positions = [i for i, stat in enumerate(stats) if stat is not None]
+    if positions:
+        boxes = ax.bxp([stats[i] for i in positions], positions=positions, patch_artist=True, widths=0.8,
+                       medianprops={"color": "0.2"})
+        colors = colormaps[cmap](np.linspace(0, 1, len(labels)))
+        for patch, i in zip(boxes["boxes"], positions):
+            patch.set_facecolor(colors[i])
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    return ax
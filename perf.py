@@ -0,0 +1,200 @@
+import cProfile
+import collections
+import contextlib
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Process-wide timing spans for the stages of a rerun (resource loads,
+# prediction, page sections, figure drawing and encoding). Each span name
+# keeps a rolling window of its most recent samples, so the admin page
+# (?admin=<HEART_ADMIN_TOKEN>; off unless the token is set, since it switches
+# process-wide captures) can show latency percentiles and histograms, and
+# export() gives the same data as JSON for dashboards. A span costs two
+# perf_counter() calls and a deque append.
+#
+# Two opt-in captures, off by default and switched from the admin page or at
+# startup with HEART_PERF_TRACEMALLOC=1 / HEART_PERF_PROFILE=1:
+# - tracemalloc: every span also records net and peak Python allocations.
+#   tracemalloc is process-global, so concurrent sessions blur each other's
+#   numbers; use it with one session at a time.
+# - cProfile: spans opened with profile=True (the page render) keep a
+#   pstats summary of their last few runs. Only one profiler can be active
+#   per process, so a span that starts while another is profiling (a
+#   concurrent session's render) is timed but not profiled.
+
+WINDOW = 500
+MAX_PROFILES = 5
+PROFILE_LINES = 30
+PERCENTILES = (50, 90, 99)
+ADMIN_TOKEN = os.environ.get("HEART_ADMIN_TOKEN")
+
+_profile_lock = threading.Lock()
+
+
+def admin_allowed(token):
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+class PerfRecorder:
+    def __init__(self, window=WINDOW, max_profiles=MAX_PROFILES):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._profiles = collections.deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.profiling = os.environ.get("HEART_PERF_PROFILE") == "1"
+        if os.environ.get("HEART_PERF_TRACEMALLOC") == "1":
+            self.set_tracemalloc(True)
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def set_tracemalloc(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name, profile=False):
+        profiler = None
+        if profile and self.profiling and _profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        # Peak tracking is reset per span; a parent's peak is the max of its own and its children's
+        frame = {"child_peak": 0}
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            frame["current"] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack = self._stack()
+        stack.append(frame)
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active (Python 3.12+ allows one per process)
+                _profile_lock.release()
+                profiler = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                _profile_lock.release()
+            stack.pop()
+            memory = None
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame["child_peak"])
+                if stack:
+                    stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+                memory = (current - frame["current"], peak - frame["current"])
+            self.record(name, seconds, memory)
+            if profiler is not None:
+                self._keep_profile(name, seconds, profiler)
+
+    def record(self, name, seconds, memory=None):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = collections.deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            samples.append((time.time(), seconds, memory))
+            self._totals[name][0] += 1
+            self._totals[name][1] += seconds
+
+    def _keep_profile(self, name, seconds, profiler):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(PROFILE_LINES)
+        with self._lock:
+            self._profiles.append({
+                "span": name,
+                "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "seconds": seconds,
+                "stats": out.getvalue(),
+            })
+
+    def samples(self, name):
+        # Recent durations of one span, in seconds, oldest first
+        with self._lock:
+            return [seconds for _, seconds, _ in self._samples.get(name, ())]
+
+    def profiles(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def stats(self):
+        with self._lock:
+            snapshot = {name: (list(samples), tuple(self._totals[name])) for name, samples in self._samples.items()}
+        report = {}
+        for name, (samples, (count, total)) in sorted(snapshot.items()):
+            ms = np.array([seconds for _, seconds, _ in samples]) * 1000
+            entry = {
+                "count": count,
+                "total_seconds": total,
+                "window": len(ms),
+                "mean_ms": float(ms.mean()),
+                "max_ms": float(ms.max()),
+                "last_ms": float(ms[-1]),
+            }
+            for q, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                entry[f"p{q}_ms"] = float(value)
+            memory = np.array([m for _, _, m in samples if m is not None], dtype=float).reshape(-1, 2)
+            if len(memory):
+                entry["net_kb_mean"] = float(memory[:, 0].mean() / 1024)
+                entry["peak_kb_max"] = float(memory[:, 1].max() / 1024)
+            report[name] = entry
+        return report
+
+    def export(self):
+        # JSON-ready snapshot: per-span summaries plus the raw rolling windows
+        with self._lock:
+            windows = {
+                name: [{"at": at, "ms": seconds * 1000, "net_bytes": m[0] if m else None, "peak_bytes": m[1] if m else None}
+                       for at, seconds, m in samples]
+                for name, samples in self._samples.items()
+            }
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "window": self.window,
+            "tracemalloc": self.tracing,
+            "profiling": self.profiling,
+            "spans": self.stats(),
+            "samples": windows,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.export(), **kwargs)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._profiles.clear()
+
+
+perf_recorder = PerfRecorder()
+
+
+def span(name, profile=False):
+    return perf_recorder.span(name, profile=profile)
@@ -0,0 +1,84 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+# Process-wide LRU/TTL cache of prediction probabilities. Every Prediction
+# page input is a bounded slider or small categorical, so users keep landing
+# on the same feature vectors; repeated ones skip the forest entirely.
+
+
+def canonical_key(row, feature_names):
+    # Keyed on the float32 values the forest actually compares, so two inputs
+    # share an entry exactly when the model cannot tell them apart
+    values = np.asarray(row[list(feature_names)], dtype=np.float32).ravel()
+    return tuple(values.tolist())
+
+
+class PredictionCache:
+    def __init__(self, maxsize=4096, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key, compute, fingerprint=None):
+        now = time.monotonic()
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                # The model file changed: every cached probability is stale
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+prediction_cache = PredictionCache()
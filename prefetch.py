@@ -0,0 +1,129 @@
+import collections
+import importlib.abc
+import importlib.machinery
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from resources import DATA_PATH, file_signature, load_query, load_stats, load_view
+
+# Background warm-up of the chart pages. While a session sits on a cheap page
+# (Prediction, About), the pages it is likely to open next are rendered
+# headless on a single background thread, one page at a time. Python threads
+# have no priority, so a prefetch competes with interactive reruns for the
+# GIL while it runs; keeping it to one thread, and to pages not yet warm for
+# the current dataset, bounds that cost. The page function runs outside any
+# Streamlit session, where widgets return their defaults and elements are
+# dropped, so what remains is loading the shared dataset view and stats and
+# filling the figure cache with the page's default figures. "Likely" comes
+# from the page transitions seen so far in this process, falling back to the
+# navigation order. HEART_PREFETCH=0 turns it off (the benchmarks do, so
+# their "cold" pages stay cold).
+
+PREFETCH_PAGES = 2
+ENABLED = os.environ.get("HEART_PREFETCH", "1") != "0"
+
+# Page modules are imported on the prefetch thread, possibly after the script
+# run that put the app directory on sys.path has finished (AppTest takes it off
+# again). Rather than changing sys.path from that thread, a finder installed once
+# here resolves the app's own top-level modules from APP_DIR when nothing else does.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _AppModuleFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path=None, target=None):
+        if path is not None:
+            return None
+        return importlib.machinery.PathFinder.find_spec(name, [APP_DIR])
+
+
+if not any(isinstance(finder, _AppModuleFinder) for finder in sys.meta_path):
+    sys.meta_path.append(_AppModuleFinder())
+
+
+def _visualize():
+    from visualize import visualize_page
+    visualize_page(load_view(DATA_PATH), load_query(DATA_PATH))
+
+
+def _analyze():
+    from analyze import analyze_page
+    analyze_page(load_view(DATA_PATH), load_stats(DATA_PATH), load_query(DATA_PATH))
+
+
+def _insights():
+    from insights import insights_page
+    insights_page(load_view(DATA_PATH), load_stats(DATA_PATH))
+
+
+PAGES = {"Visualize Data": _visualize, "Analyze Data": _analyze, "Insights": _insights}
+
+
+class _HeadlessFilter(logging.Filter):
+    # Streamlit warns on every element call made without a session; expected on prefetch threads
+    def filter(self, record):
+        return not threading.current_thread().name.startswith("prefetch")
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_HeadlessFilter())
+
+
+class Prefetcher:
+    def __init__(self, pages=PAGES):
+        self.pages = pages
+        self.transitions = collections.Counter()
+        self._warmed = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="prefetch")
+        self.runs = 0
+        self.failures = 0
+
+    def record_visit(self, previous, page):
+        if previous is not None and previous != page:
+            with self._lock:
+                self.transitions[(previous, page)] += 1
+
+    def likely_next(self, page, limit=PREFETCH_PAGES):
+        with self._lock:
+            seen = {to: count for (start, to), count in self.transitions.items() if start == page and to in self.pages}
+        order = list(self.pages)
+        return sorted(order, key=lambda name: (-seen.get(name, 0), order.index(name)))[:limit]
+
+    def warm(self, pages):
+        # Each page is warmed once per dataset version. The file's signature is
+        # known before any page has loaded the dataset, unlike its cache entry.
+        if not ENABLED:
+            return
+        version = file_signature(DATA_PATH)
+        for page in pages:
+            with self._lock:
+                if (page, version) in self._warmed:
+                    continue
+                self._warmed.add((page, version))
+            self._pool.submit(self._run, page)
+
+    def _run(self, page):
+        from figure_cache import page_figures
+        from perf import span
+
+        try:
+            with span(f"prefetch/{page}"), page_figures(deferred=False):
+                self.pages[page]()
+            self.runs += 1
+        except Exception:
+            self.failures += 1
+            logging.getLogger(__name__).exception("Prefetching %s failed", page)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "warmed": sorted(f"{page}@{mtime_ns}:{size}" for page, (mtime_ns, size) in self._warmed),
+                "runs": self.runs,
+                "failures": self.failures,
+                "transitions": {f"{start} -> {to}": count for (start, to), count in self.transitions.items()},
+            }
+
+
+prefetcher = Prefetcher()
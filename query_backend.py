@@ -0,0 +1,385 @@
+import argparse
+import collections
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import QuantileSketch
+
+# Aggregations behind the column explorer and the categorical plots
+# (unique values, describe(), value_counts) as queries against a pluggable
+# backend, so only the aggregated result reaches the page:
+#
+#   pandas  the loaded dataset frame (the default, and the fallback)
+#   arrow   a Parquet copy of the CSV, scanned one column and one batch at a
+#           time with pyarrow, so a query holds one batch in memory
+#   duckdb  the same Parquet file queried with DuckDB (pip install duckdb),
+#           which pushes the aggregation into its own multi-threaded engine
+#
+#   python query_backend.py Heart_Disease_Prediction.csv
+#
+# writes the Parquet copy next to the CSV. HEART_QUERY_BACKEND picks a
+# backend; "auto" takes DuckDB, then Arrow, while the Parquet copy matches the
+# CSV, and pandas otherwise. Results are cached per backend (one backend per
+# dataset version, shared by all sessions). Quartiles are exact with every
+# backend: Arrow takes them from its one-pass sketch while a column has at
+# most 512 distinct values (see stats_engine.QuantileSketch), and otherwise
+# narrows each order statistic down with further scans of the column (a
+# histogram over the remaining value range per scan, until few enough values
+# are left to sort), so memory stays bounded by a batch.
+
+QUERY_BACKEND = os.environ.get("HEART_QUERY_BACKEND", "auto")
+BACKENDS = ("auto", "pandas", "arrow", "duckdb")
+FINGERPRINT_KEY = b"heart.source_fingerprint"
+ROW_GROUP_ROWS = 1_000_000
+BATCH_ROWS = 1_000_000
+MAX_CACHED_RESULTS = 256
+QUARTILES = (0.25, 0.5, 0.75)
+# Order-statistic search: bins per refining scan, and how many values may be collected and sorted
+SEARCH_BINS = 4096
+SEARCH_COLLECT_ROWS = 1_000_000
+NUMERIC_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+class QueryBackend:
+    # Subclasses set columns/numeric_columns and implement _unique, _value_counts
+    # (non-null counts in order of first appearance) and _numeric_summary
+    name = None
+
+    def __init__(self, columns, numeric_columns):
+        self.columns = list(columns)
+        self.numeric_columns = list(numeric_columns)
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        value = compute()
+        with self._lock:
+            self._results[key] = value
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return value
+
+    def unique(self, column):
+        # Same values and order as df[column].unique()
+        values = self._cached(("unique", column), lambda: self._unique(column))
+        return values.copy()
+
+    def value_counts(self, column, sort=True):
+        # Same as df[column].value_counts(sort=sort): ties keep their order of first appearance
+        counts = self._cached(("value_counts", column), lambda: self._value_counts(column))
+        return counts.sort_values(ascending=False, kind="stable") if sort else counts.copy()
+
+    def describe(self, columns):
+        # Mirrors df[columns].describe(): numeric columns only if there are any, else count/unique/top/freq
+        numeric = [column for column in columns if column in self.numeric_columns]
+        if numeric:
+            return pd.DataFrame({
+                column: self._cached(("summary", column), lambda column=column: self._numeric_summary(column))
+                for column in numeric
+            }, index=NUMERIC_STATS)
+        table = {}
+        for column in columns:
+            counts = self.value_counts(column)
+            counts = counts[counts > 0]
+            table[column] = {
+                "count": int(counts.sum()),
+                "unique": len(counts),
+                "top": counts.index[0] if len(counts) else np.nan,
+                "freq": int(counts.iloc[0]) if len(counts) else np.nan,
+            }
+        return pd.DataFrame(table, index=["count", "unique", "top", "freq"], dtype=object)
+
+
+class PandasBackend(QueryBackend):
+    name = "pandas"
+
+    def __init__(self, df):
+        super().__init__(df.columns, df.select_dtypes(include=["number"]).columns)
+        self._df = df
+
+    def _unique(self, column):
+        return self._df[column].unique()
+
+    def _value_counts(self, column):
+        return self._df[column].value_counts(sort=False)
+
+    def _numeric_summary(self, column):
+        return self._df[column].describe()
+
+
+class ArrowBackend(QueryBackend):
+    name = "arrow"
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+        numeric = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+        super().__init__(schema.names, numeric)
+        self.path = path
+
+    def _batches(self, column):
+        import pyarrow.parquet as pq
+
+        # A reader per scan: ParquetFile objects are not safe to share between threads. Text
+        # columns are read dictionary-encoded, so a batch is small integer codes plus its distinct values
+        dictionary = [column] if column not in self.numeric_columns else None
+        for batch in pq.ParquetFile(self.path, read_dictionary=dictionary).iter_batches(batch_size=BATCH_ROWS,
+                                                                                         columns=[column]):
+            yield batch.column(0)
+
+    def _unique(self, column):
+        import pyarrow.compute as pc
+
+        seen = {}
+        for values in self._batches(column):
+            seen.update(dict.fromkeys(pc.unique(values).to_pylist()))
+        return _unique_array(list(seen), column in self.numeric_columns)
+
+    def _value_counts(self, column):
+        import pyarrow.compute as pc
+
+        counts = {}
+        for values in self._batches(column):
+            batch_counts = pc.value_counts(pc.drop_null(values))
+            for value, count in zip(batch_counts.field("values").to_pylist(), batch_counts.field("counts").to_pylist()):
+                counts[value] = counts.get(value, 0) + count
+        return pd.Series(list(counts.values()), index=pd.Index(list(counts), name=column), dtype="int64", name="count")
+
+    def _numeric_values(self, column):
+        import pyarrow.compute as pc
+
+        for values in self._batches(column):
+            x = pc.drop_null(values).to_numpy(zero_copy_only=False).astype(np.float64)
+            yield x[~np.isnan(x)]
+
+    def _order_statistics(self, column, ranks, n, low, high):
+        # Exact k-th smallest values (0-based ranks), each scan shrinking every rank's value range
+        # [lo, hi] to one of SEARCH_BINS bins; `below` counts the values under lo
+        search = {rank: {"lo": low, "hi": high, "below": 0, "count": n} for rank in ranks}
+        found = {}
+        while len(found) < len(search):
+            active = {rank: state for rank, state in search.items() if rank not in found}
+            for state in active.values():
+                state["collect"] = state["count"] <= SEARCH_COLLECT_ROWS
+                state["edges"] = np.linspace(state["lo"], state["hi"], SEARCH_BINS + 1)
+                state["bins"] = np.zeros(SEARCH_BINS, dtype=np.int64)
+                state["values"] = []
+            for x in self._numeric_values(column):
+                for state in active.values():
+                    inside = x[(x >= state["lo"]) & (x <= state["hi"])]
+                    if state["collect"]:
+                        state["values"].append(inside)
+                    else:
+                        # side="right" puts x in bin b when edges[b] <= x < edges[b + 1] (the last bin ends at hi)
+                        bins = np.searchsorted(state["edges"][1:-1], inside, side="right")
+                        state["bins"] += np.bincount(bins, minlength=SEARCH_BINS)
+            for rank, state in active.items():
+                if state["collect"]:
+                    found[rank] = float(np.sort(np.concatenate(state["values"]))[rank - state["below"]])
+                    continue
+                cumulative = np.cumsum(state["bins"])
+                b = int(np.searchsorted(cumulative, rank - state["below"], side="right"))
+                state["below"] += int(cumulative[b - 1]) if b else 0
+                state["count"] = int(state["bins"][b])
+                state["lo"] = float(state["edges"][b])
+                # Bins exclude their upper edge, except the last
+                state["hi"] = float(state["edges"][b + 1]) if b == SEARCH_BINS - 1 else float(
+                    np.nextafter(state["edges"][b + 1], -np.inf))
+                if state["lo"] >= state["hi"]:
+                    found[rank] = state["lo"]
+        return found
+
+    def _quartiles(self, column, n, sketch, low, high):
+        if sketch.exact:
+            return [sketch.quantile(q) for q in QUARTILES]
+        # Same linear interpolation as pandas between the two order statistics around each position
+        positions = [(n - 1) * q for q in QUARTILES]
+        ranks = sorted({int(np.floor(p)) for p in positions} | {int(np.ceil(p)) for p in positions})
+        values = self._order_statistics(column, ranks, n, low, high)
+        return [float(np.quantile([values[int(np.floor(p))], values[int(np.ceil(p))]], p - np.floor(p)))
+                for p in positions]
+
+    def _numeric_summary(self, column):
+        # One pass: shifted sums for mean/std (as in StreamingStats), a sketch for the quartiles
+        # (more scans only for quartiles of columns with too many distinct values for the sketch)
+
+        n, total, squares, shift = 0, 0.0, 0.0, None
+        low, high = np.inf, -np.inf
+        sketch = QuantileSketch()
+        for x in self._numeric_values(column):
+            if not len(x):
+                continue
+            if shift is None:
+                shift = x.mean()
+            z = x - shift
+            n += len(x)
+            total += z.sum()
+            squares += (z * z).sum()
+            low, high = min(low, x.min()), max(high, x.max())
+            sketch.update(x)
+        if not n:
+            return pd.Series([0.0] + [np.nan] * 7, index=NUMERIC_STATS, name=column)
+        std = np.sqrt(max((squares - total ** 2 / n) / (n - 1), 0.0)) if n > 1 else np.nan
+        return pd.Series([float(n), shift + total / n, std, low, *self._quartiles(column, n, sketch, low, high), high],
+                         index=NUMERIC_STATS, name=column)
+
+
+class DuckDBBackend(QueryBackend):
+    name = "duckdb"
+
+    def __init__(self, path):
+        import duckdb
+
+        self.path = path
+        self._connection = duckdb.connect()
+        literal = path.replace("'", "''")
+        self._connection.execute(f"CREATE VIEW heart AS SELECT * FROM read_parquet('{literal}', file_row_number = true)")
+        described = self._query("DESCRIBE SELECT * EXCLUDE (file_row_number) FROM heart")
+        numeric_types = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "FLOAT", "DOUBLE", "DECIMAL")
+        super().__init__([row[0] for row in described],
+                         [row[0] for row in described if row[1].startswith(numeric_types)])
+
+    def _query(self, sql):
+        # A cursor per query: a DuckDB connection must not be used from several threads at once
+        return self._connection.cursor().execute(sql).fetchall()
+
+    def _unique(self, column):
+        q = _identifier(column)
+        rows = self._query(f"SELECT {q} FROM heart GROUP BY {q} ORDER BY min(file_row_number)")
+        return _unique_array([row[0] for row in rows], column in self.numeric_columns)
+
+    def _value_counts(self, column):
+        q = _identifier(column)
+        rows = self._query(f"SELECT {q}, count(*) FROM heart WHERE {q} IS NOT NULL GROUP BY {q} "
+                           f"ORDER BY min(file_row_number)")
+        return pd.Series([row[1] for row in rows], index=pd.Index([row[0] for row in rows], name=column),
+                         dtype="int64", name="count")
+
+    def _numeric_summary(self, column):
+        q = _identifier(column)
+        row = self._query(
+            f"SELECT count({q}), avg({q}), stddev_samp({q}), min({q}), quantile_cont({q}, 0.25), "
+            f"quantile_cont({q}, 0.5), quantile_cont({q}, 0.75), max({q}) FROM heart"
+        )[0]
+        return pd.Series([np.nan if value is None else float(value) for value in row], index=NUMERIC_STATS, name=column)
+
+
+def _unique_array(values, numeric):
+    # Like Series.unique(): numbers stay numeric (NaN for nulls), everything else is an object array
+    if not numeric:
+        return np.array(values, dtype=object)
+    if None in values:
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+    return np.array(values)
+
+
+def _identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def duckdb_available():
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_parquet(csv_path, out_path=None, fingerprint=None, chunk_rows=ROW_GROUP_ROWS):
+    # Types from a streaming pass over the whole file: integers only where every
+    # chunk parsed as integers without nulls, float64 for other numbers, text as strings
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from columnar import integer_dtype
+    from resources import file_fingerprint
+    from stats_engine import StreamingStats
+
+    out_path = out_path or parquet_path(csv_path)
+    stats = StreamingStats.from_csv(csv_path, chunk_rows=chunk_rows)
+    fields = []
+    for column in stats.columns:
+        if column not in stats.numeric_columns:
+            fields.append(pa.field(column, pa.string()))
+        elif column in stats.integer_columns and not stats.nulls[column]:
+            i = stats.numeric_columns.index(column)
+            dtype = integer_dtype(stats.minimum[i], stats.maximum[i])
+            fields.append(pa.field(column, pa.from_numpy_dtype(dtype)))
+        else:
+            fields.append(pa.field(column, pa.float64()))
+    schema = pa.schema(fields, metadata={FINGERPRINT_KEY: fingerprint or file_fingerprint(csv_path)})
+
+    tmp_path = f"{out_path}.tmp"
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    os.replace(tmp_path, out_path)
+    return rows
+
+
+def source_fingerprint(path):
+    import pyarrow.parquet as pq
+
+    return (pq.read_schema(path).metadata or {}).get(FINGERPRINT_KEY, b"").decode()
+
+
+def open_backend(data_path, kind=QUERY_BACKEND, fingerprint=None):
+    from resources import file_fingerprint, load_view
+
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown query backend {kind!r}; expected one of {BACKENDS}")
+    table = parquet_path(data_path)
+    current = os.path.exists(table) and source_fingerprint(table) == (fingerprint or file_fingerprint(data_path))
+    if kind == "auto":
+        kind = ("duckdb" if duckdb_available() else "arrow") if current else "pandas"
+    if kind == "pandas":
+        return PandasBackend(load_view(data_path).frame)
+    if not current:
+        raise ValueError(f"{table} is missing or older than {data_path}; run python query_backend.py {data_path}")
+    return DuckDBBackend(table) if kind == "duckdb" else ArrowBackend(table)
+
+
+def draw_counts(ax, counts, palette=None, edgecolor=None):
+    # Bars from value_counts(sort=False), in place of sns.countplot(x=values)
+    import seaborn as sns
+
+    labels = pd.Series(np.asarray(counts.index, dtype=object), name=counts.index.name)
+    sns.barplot(x=labels, y=counts.to_numpy(), hue=labels, palette=palette, edgecolor=edgecolor, legend=False,
+                errorbar=None, ax=ax)
+    ax.set_ylabel("count")
+    return ax
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the Parquet copy of a CSV dataset that the query backends read.")
+    parser.add_argument("csv", help="CSV file to convert")
+    parser.add_argument("--out", help="Output file (default: <csv name>.parquet)")
+    parser.add_argument("--chunk-size", type=int, default=ROW_GROUP_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = write_parquet(args.csv, args.out, chunk_rows=args.chunk_size)
+    print(f"Wrote {rows} rows to {args.out or parquet_path(args.csv)} in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
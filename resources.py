@@ -0,0 +1,196 @@
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+import pandas as pd
+
+from columnar import columnar_path, load_columnar, read_schema
+from dataset_view import DatasetView
+from flat_forest import as_predictor, is_tree_ensemble
+from perf import span
+from shared_model import attach_explainer, attach_model, is_current, shared_path
+from stats_engine import load_or_build_stats
+
+# HEART_DATA_PATH points the app at another CSV with the same schema (e.g. the benchmark datasets)
+DATA_PATH = os.environ.get("HEART_DATA_PATH", "Heart_Disease_Prediction.csv")
+# Point at a compacted .npz forest (see compact.py) to serve a smaller variant
+MODEL_PATH = os.environ.get("HEART_MODEL_PATH", "RF_heart_disease_model.pkl")
+POSITIVE_CLASS = "Warning ! Anomaly  detected in your heart."
+
+# Process-wide resource cache shared by every Streamlit session.
+# Entries are keyed by (kind, absolute path) and reloaded only when the
+# file's mtime/size changes *and* its content hash differs. Loaders are
+# called as loader(path, fingerprint) with that hash, so they never re-read
+# the file just to identify it.
+_registry_lock = threading.Lock()
+_locks = {}
+_entries = {}
+_stats = {}
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    # Cheap change check: (mtime, size) moves whenever the file is rewritten
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _key_lock(key):
+    with _registry_lock:
+        if key not in _stats:
+            _stats[key] = {
+                "hits": 0,
+                "misses": 0,
+                "reloads": 0,
+                "load_time_total": 0.0,
+                "last_load_time": None,
+                "fingerprint": None,
+            }
+        return _locks.setdefault(key, threading.Lock())
+
+
+def cached_resource(kind, path, loader, fingerprint=None):
+    # `fingerprint`: the file's content hash when the caller already has it
+    key = (kind, os.path.abspath(path))
+    lock = _key_lock(key)
+    with lock:
+        signature = file_signature(path)
+        stats = _stats[key]
+        entry = _entries.get(key)
+
+        if entry is not None and entry["signature"] == signature:
+            stats["hits"] += 1
+            return entry["value"]
+
+        # The file was touched (or never loaded): only reload if the content changed
+        digest = fingerprint or file_fingerprint(path)
+        if entry is not None and entry["fingerprint"] == digest:
+            entry["signature"] = signature
+            stats["hits"] += 1
+            return entry["value"]
+
+        start = time.perf_counter()
+        with span(f"load/{kind}"):
+            value = loader(path, digest)
+        elapsed = time.perf_counter() - start
+
+        stats["misses"] += 1
+        if entry is not None:
+            stats["reloads"] += 1
+        stats["load_time_total"] += elapsed
+        stats["last_load_time"] = elapsed
+        stats["fingerprint"] = digest
+        _entries[key] = {"signature": signature, "fingerprint": digest, "value": value}
+        return value
+
+
+def resource_fingerprint(kind, path):
+    # Content hash of the currently cached resource, or None if not loaded yet
+    entry = _entries.get((kind, os.path.abspath(path)))
+    return entry["fingerprint"] if entry is not None else None
+
+
+def resource_stats():
+    with _registry_lock:
+        return {
+            f"{kind}:{path}": dict(stats)
+            for (kind, path), stats in _stats.items()
+        }
+
+
+def clear_resources():
+    with _registry_lock:
+        _entries.clear()
+        _stats.clear()
+
+
+def _read_dataset(path, fingerprint):
+    # Prefer the memory-mapped columnar copy (python columnar.py <csv>) while it matches the CSV
+    columns_path = columnar_path(path)
+    if os.path.isdir(columns_path) and read_schema(columns_path)["source_fingerprint"] == fingerprint:
+        return load_columnar(columns_path)
+    df = pd.read_csv(path)
+    # Carried through copies so downstream caches can key on the source file
+    df.attrs["fingerprint"] = fingerprint
+    return df
+
+
+def load_dataset(path=DATA_PATH):
+    return cached_resource("dataset", path, _read_dataset)
+
+
+def load_view(path=DATA_PATH):
+    # Read-only view shared by all sessions; pages get this instead of a per-session copy
+    return cached_resource("view", path, lambda p, fingerprint: DatasetView(
+        cached_resource("dataset", p, _read_dataset, fingerprint)))
+
+
+def load_stats(path=DATA_PATH):
+    # Precomputed summary statistics, persisted next to the dataset
+    return cached_resource("stats", path, lambda p, fingerprint: load_or_build_stats(p))
+
+
+def read_model(path, fingerprint=None):
+    # Uncached load of a pickled model or a compacted .npz forest (load_model caches it)
+    if path.endswith(".npz"):
+        from compact import load_forest
+
+        return load_forest(path)
+    return joblib.load(path)
+
+
+def load_model(path=MODEL_PATH):
+    return cached_resource("model", path, read_model)
+
+
+def _shared_export(path, fingerprint):
+    # Memory-mapped export (python shared_model.py <model>) while it matches the model file
+    shared = shared_path(path)
+    return shared if is_current(shared, fingerprint) else None
+
+
+def load_explainer(path=MODEL_PATH):
+    # Per-prediction feature contributions need the forest's node covers, so only sklearn forests qualify
+    def build(p, fingerprint):
+        shared = _shared_export(p, fingerprint)
+        if shared is not None:
+            return attach_explainer(shared)
+        model = load_model(p)
+        if not is_tree_ensemble(model):
+            return None
+        from explain import TreeExplainer
+
+        return TreeExplainer.from_model(model)
+
+    return cached_resource("explainer", path, build)
+
+
+def load_predictor(path=MODEL_PATH):
+    # Flat array evaluator compiled from the pickled forest, for low-latency prediction
+    def build(p, fingerprint):
+        shared = _shared_export(p, fingerprint)
+        return attach_model(shared) if shared is not None else as_predictor(load_model(p))
+
+    return cached_resource("predictor", path, build)
+
+
+def load_query(path=DATA_PATH):
+    # Aggregation backend for the column explorer and count plots (see query_backend.py)
+    from query_backend import open_backend
+
+    return cached_resource("query", path, lambda p, fingerprint: open_backend(p, fingerprint=fingerprint))
+
+
+def dataset_schema(path=DATA_PATH):
+    # The CSV header is the schema: 13 model features followed by the target
+    columns = pd.read_csv(path, nrows=0).columns.tolist()
+    return columns[:-1], columns[-1]
@@ -0,0 +1,320 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, file_fingerprint
+from shared_model import export_model, shared_path
+from stats_engine import prefix_digest
+from train import ARTIFACT_DIR, SEED, promote
+
+# Incremental retraining as labeled encounters are appended to the dataset
+# CSV. Instead of re-running the full search in train.py over the whole
+# history, each update reads only the rows appended since the last one (the
+# same prefix check the statistics engine uses), sends a fixed fraction of
+# them to a held-out set, and either
+#
+#   append     adds --trees new trees to the served random forest
+#              (warm_start), fitted on the new rows plus a reservoir sample
+#              of earlier training rows; the oldest trees are dropped beyond
+#              --max-trees so prediction cost stays bounded
+#   reservoir  refits a fresh model with the served model's parameters on
+#              the reservoir plus the new rows
+#
+# The candidate is scored against the current model on the held-out set and
+# only swapped in (atomically, as train.py --promote does) when it is no worse
+# than --tolerance, once the held-out set has MIN_HOLDOUT_ROWS rows. Only
+# appended rows are ever held out: the served model has likely been trained
+# on the rows already there at --init, which would flatter it. The reservoirs
+# are fixed-size uniform samples (Algorithm R) of everything seen, so an
+# update costs O(new rows + reservoir) however long the history gets. Every
+# update appends its timings and scores to history.jsonl in the state
+# directory.
+#
+#   python retrain.py --init          # start from the current model and dataset
+#   python retrain.py                 # after rows were appended to the CSV
+#   python retrain.py --mode reservoir --dry-run
+
+STATE_DIR = os.path.join(ARTIFACT_DIR, "incremental")
+STATE_FILE = "state.joblib"
+HISTORY_FILE = "history.jsonl"
+MODES = ("append", "reservoir")
+HOLDOUT_FRACTION = 0.2
+RESERVOIR_ROWS = 5_000
+HOLDOUT_ROWS = 2_000
+MIN_HOLDOUT_ROWS = 50
+TREES_PER_UPDATE = 10
+MAX_TREES = 200
+# Largest drop in held-out ROC AUC (and accuracy) a candidate may show and still be promoted
+TOLERANCE = 0.01
+CHUNK_ROWS = 100_000
+
+
+class Reservoir:
+    # Uniform fixed-size sample of all rows ever offered (Algorithm R)
+
+    def __init__(self, size, columns):
+        self.size = size
+        self.rows = pd.DataFrame(columns=columns)
+        self.seen = 0
+
+    def update(self, new, rng):
+        if not len(new):
+            return
+        new = new.reset_index(drop=True)
+        # Row t (0-based over everything seen) fills slot t while there is room, and
+        # afterwards replaces a random slot with probability size / (t + 1)
+        t = self.seen + np.arange(len(new))
+        slots = np.where(t < self.size, t, rng.integers(0, t + 1))
+        rows = np.flatnonzero(slots < self.size)
+        slots = slots[rows]
+        # A later row landing on the same slot wins, as it would one row at a time
+        _, last = np.unique(slots[::-1], return_index=True)
+        chosen = len(slots) - 1 - last
+        slots, rows = slots[chosen], rows[chosen]
+        # Slot order carries no meaning, so replaced rows are dropped and their replacements appended
+        kept = self.rows[~np.isin(np.arange(len(self.rows)), slots)]
+        self.rows = _concat([kept, new.iloc[rows]], self.rows.columns)
+        self.seen += len(new)
+
+
+def _concat(frames, columns):
+    frames = [frame for frame in frames if len(frame)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def _split(df):
+    return df.iloc[:, :-1], df.iloc[:, -1]
+
+
+def _scores(model, holdout):
+    X, y = _split(holdout)
+    if not len(holdout):
+        return {"accuracy": None, "roc_auc": None}
+    proba = model.predict_proba(X)[:, list(model.classes_).index(POSITIVE_CLASS)]
+    positive = (y == POSITIVE_CLASS).to_numpy()
+    return {
+        "accuracy": float(accuracy_score(y, model.predict(X))),
+        # Undefined until the held-out set has both classes
+        "roc_auc": float(roc_auc_score(positive, proba)) if 0 < positive.sum() < len(positive) else None,
+    }
+
+
+def _no_worse(candidate, current, tolerance):
+    return all(
+        candidate[metric] is None or current[metric] is None or candidate[metric] >= current[metric] - tolerance
+        for metric in ("accuracy", "roc_auc")
+    )
+
+
+def _state_path(state_dir):
+    return os.path.join(state_dir, STATE_FILE)
+
+
+def save_state(state, state_dir=STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = _state_path(state_dir)
+    joblib.dump(state, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def load_state(state_dir=STATE_DIR):
+    path = _state_path(state_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No incremental training state in {state_dir}; run python retrain.py --init first")
+    return joblib.load(path)
+
+
+def _mark_source(state, data_path):
+    state["source_bytes"] = os.path.getsize(data_path)
+    state["source_prefix_digest"] = prefix_digest(data_path, state["source_bytes"])
+
+
+def _ingest(state, rows):
+    # Send a fixed share of new rows to the held-out reservoir; returns the rest
+    held_out = state["rng"].random(len(rows)) < HOLDOUT_FRACTION
+    state["holdout"].update(rows[held_out], state["rng"])
+    return rows[~held_out]
+
+
+def init_state(data_path=DATA_PATH, state_dir=STATE_DIR, seed=SEED):
+    # One pass over the existing dataset, all of it into the training reservoir (the served model
+    # has likely seen it); later updates only read what is appended after it. An empty file has
+    # no header yet: the columns come from the first update
+    empty = os.path.getsize(data_path) == 0
+    columns = None if empty else pd.read_csv(data_path, nrows=0).columns.tolist()
+    state = {
+        "columns": columns,
+        "rng": np.random.default_rng(seed),
+        "reservoir": Reservoir(RESERVOIR_ROWS, columns),
+        "holdout": Reservoir(HOLDOUT_ROWS, columns),
+        "updates": 0,
+    }
+    for chunk in [] if empty else pd.read_csv(data_path, chunksize=CHUNK_ROWS):
+        state["reservoir"].update(chunk, state["rng"])
+    _mark_source(state, data_path)
+    save_state(state, state_dir)
+    return state
+
+
+def read_appended(state, data_path):
+    # Rows appended since the last update, or None when earlier rows changed (run --init again)
+    size = os.path.getsize(data_path)
+    offset = state["source_bytes"]
+    if size < offset or prefix_digest(data_path, offset) != state["source_prefix_digest"]:
+        return None
+    if offset == 0:
+        # Tracking began at an empty file: all of it is new, header first
+        return pd.read_csv(data_path) if size else pd.DataFrame(columns=state["columns"])
+    with open(data_path, "rb") as f:
+        f.seek(offset - 1)
+        if f.read(1) != b"\n" and f.read(1) not in (b"", b"\n", b"\r"):
+            # The last counted line had no newline and the append continued it
+            return None
+        if size == offset:
+            return pd.DataFrame(columns=state["columns"])
+        return pd.read_csv(f, header=None, names=state["columns"])
+
+
+def _append_trees(model, X, y, trees, max_trees):
+    if not isinstance(model, RandomForestClassifier):
+        raise ValueError(f"--mode append needs a random forest, not {type(model).__name__}; use --mode reservoir")
+    # warm_start keeps the served trees and fits only the new ones
+    candidate = copy.deepcopy(model).set_params(warm_start=True, n_estimators=len(model.estimators_) + trees)
+    candidate.fit(X, y)
+    candidate.estimators_ = candidate.estimators_[-max_trees:]
+    return candidate.set_params(warm_start=False, n_estimators=len(candidate.estimators_))
+
+
+def update(data_path=DATA_PATH, model_path=MODEL_PATH, mode="append", state_dir=STATE_DIR, trees=TREES_PER_UPDATE,
+           max_trees=MAX_TREES, tolerance=TOLERANCE, dry_run=False, force=False, out_dir=ARTIFACT_DIR):
+    timings = {}
+    start = time.perf_counter()
+    state = load_state(state_dir)
+    new = read_appended(state, data_path)
+    if new is None:
+        raise ValueError(f"Rows already trained on in {data_path} changed; run python retrain.py --init")
+    if state["columns"] is None:
+        state["columns"] = new.columns.tolist()
+    timings["read_seconds"] = time.perf_counter() - start
+
+    report = {"mode": mode, "rows": {"new": len(new)}, "accepted": False, "promoted": False}
+    if not len(new):
+        report["timings"] = timings
+        return report
+
+    step = time.perf_counter()
+    train_rows = _ingest(state, new)
+    fit_rows = _concat([state["reservoir"].rows, train_rows], state["columns"])
+    report["rows"].update({"new_train": len(train_rows), "new_holdout": len(new) - len(train_rows),
+                           "fit": len(fit_rows), "holdout": len(state["holdout"].rows)})
+    timings["sample_seconds"] = time.perf_counter() - step
+
+    model = joblib.load(model_path)
+    X, y = _split(fit_rows)
+    step = time.perf_counter()
+    if y.nunique() < len(model.classes_):
+        raise ValueError("The reservoir and new rows do not cover every class yet; wait for more data")
+    if mode == "append":
+        candidate = _append_trees(model, X, y, trees, max_trees)
+        report["trees"] = {"before": len(model.estimators_), "after": len(candidate.estimators_)}
+    else:
+        candidate = clone(model).fit(X, y)
+    timings["fit_seconds"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    holdout = state["holdout"].rows
+    report["scores"] = {"current": _scores(model, holdout), "candidate": _scores(candidate, holdout)}
+    report["accepted"] = force or (len(holdout) >= MIN_HOLDOUT_ROWS and _no_worse(
+        report["scores"]["candidate"], report["scores"]["current"], tolerance))
+    timings["validate_seconds"] = time.perf_counter() - step
+
+    # The sampled rows advance even when the candidate is rejected: they are not read again
+    state["reservoir"].update(train_rows, state["rng"])
+    _mark_source(state, data_path)
+    state["updates"] += 1
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report["version"] = version
+    if report["accepted"] and not dry_run:
+        step = time.perf_counter()
+        os.makedirs(out_dir, exist_ok=True)
+        artifact = os.path.join(out_dir, f"heart_model-{version}-{mode}.pkl")
+        joblib.dump(candidate, artifact)
+        promote(artifact, model_path)
+        # Keep the memory-mapped export for worker processes current, if one is in use
+        if os.path.isdir(shared_path(model_path)):
+            export_model(model_path)
+        report.update({"artifact": artifact, "promoted": True, "model_fingerprint": file_fingerprint(model_path)})
+        timings["swap_seconds"] = time.perf_counter() - step
+    if not dry_run:
+        save_state(state, state_dir)
+
+    timings["total_seconds"] = time.perf_counter() - start
+    report["timings"] = timings
+    with open(os.path.join(state_dir, HISTORY_FILE), "a") as f:
+        f.write(json.dumps(dict(report, dry_run=dry_run)) + "\n")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold newly appended labeled rows into the served model.")
+    parser.add_argument("--data", default=DATA_PATH, help="Dataset CSV new rows are appended to")
+    parser.add_argument("--model", default=MODEL_PATH, help="Model file the app serves")
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    parser.add_argument("--init", action="store_true", help="Start tracking the dataset from its current end")
+    parser.add_argument("--mode", choices=MODES, default="append")
+    parser.add_argument("--trees", type=int, default=TREES_PER_UPDATE, help="Trees added per update (append mode)")
+    parser.add_argument("--max-trees", type=int, default=MAX_TREES, help="Oldest trees are dropped beyond this")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--dry-run", action="store_true", help="Score the candidate but keep the model and state")
+    parser.add_argument("--force", action="store_true", help="Promote without held-out validation")
+    parser.add_argument("--out", default=ARTIFACT_DIR, help="Directory for versioned artifacts")
+    args = parser.parse_args(argv)
+
+    if args.init:
+        start = time.perf_counter()
+        state = init_state(args.data, args.state_dir)
+        print(f"Tracking {args.data} from byte {state['source_bytes']:,}: "
+              f"{len(state['reservoir'].rows)} reservoir rows, {len(state['holdout'].rows)} held out "
+              f"({time.perf_counter() - start:.2f}s)", file=sys.stderr)
+        return 0
+
+    report = update(args.data, args.model, args.mode, args.state_dir, args.trees, args.max_trees, args.tolerance,
+                    args.dry_run, args.force, args.out)
+    if not report["rows"]["new"]:
+        print(f"No new rows in {args.data}", file=sys.stderr)
+        return 0
+    current, candidate = report["scores"]["current"], report["scores"]["candidate"]
+    timings = "  ".join(f"{name[:-8]} {seconds:.2f}s" for name, seconds in report["timings"].items())
+    print(f"{report['rows']['new']} new rows ({report['rows']['new_train']} train, "
+          f"{report['rows']['new_holdout']} held out), fit on {report['rows']['fit']}", file=sys.stderr)
+    nan = float("nan")
+    print(f"held-out accuracy {current['accuracy'] or nan:.3f} -> {candidate['accuracy'] or nan:.3f}, "
+          f"roc auc {current['roc_auc'] or nan:.3f} -> {candidate['roc_auc'] or nan:.3f}", file=sys.stderr)
+    print(timings, file=sys.stderr)
+    if args.dry_run:
+        print(f"Dry run: candidate {'accepted' if report['accepted'] else 'rejected'}; model and state unchanged",
+              file=sys.stderr)
+    elif report["promoted"]:
+        print(f"Promoted {report['artifact']} to {args.model}", file=sys.stderr)
+    elif not report["accepted"] and report["rows"]["holdout"] < MIN_HOLDOUT_ROWS:
+        print(f"Not promoted: {report['rows']['holdout']} held-out rows so far, {MIN_HOLDOUT_ROWS} needed",
+              file=sys.stderr)
+    elif not report["accepted"]:
+        print("Candidate rejected: held-out scores dropped by more than the tolerance", file=sys.stderr)
+    return 0 if report["accepted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+# Large-data rendering for scatter and pair plots. Up to ROW_THRESHOLD rows
+# the usual seaborn plots are drawn point by point; above it, panels switch
+# to binned densities (2D histograms / hexbin), KDEs evaluated on a fixed
+# grid from binned counts, or a stratified sample when a hue is requested.
+# Per-panel binning runs in a thread pool (NumPy releases the GIL); drawing
+# stays on the calling thread because matplotlib is not thread-safe.
+
+ROW_THRESHOLD = int(os.environ.get("HEART_PLOT_ROW_THRESHOLD", 20_000))
+SAMPLE_ROWS = 5_000
+# Beyond this many hue values (a continuous column), strata are too small to sample by
+MAX_STRATA = 50
+GRID_SIZE = 128
+PANEL_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def is_large(df, threshold=None):
+    return len(df) > (ROW_THRESHOLD if threshold is None else threshold)
+
+
+def stratified_sample(df, n=SAMPLE_ROWS, by=None, seed=0):
+    if len(df) <= n:
+        return df
+    if by is None or by not in df.columns or df[by].nunique() > MAX_STRATA:
+        return df.sample(n, random_state=seed)
+    # Keep every group's share of rows, so rare classes stay visible
+    fraction = n / len(df)
+    return df.groupby(by, group_keys=False, observed=True).sample(frac=fraction, random_state=seed)
+
+
+def _gaussian_kernel(bandwidth, bin_width):
+    if not bandwidth or not bin_width:
+        return np.ones(1)
+    sigma = bandwidth / bin_width
+    radius = max(1, int(np.ceil(3 * sigma)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+def _smooth(counts, kernel, axis):
+    return np.apply_along_axis(lambda row: np.convolve(row, kernel, mode="same"), axis, counts)
+
+
+def _scott_bandwidth(values, dims):
+    return values.std() * len(values) ** (-1.0 / (dims + 4))
+
+
+def kde_1d(values, grid_size=GRID_SIZE * 4):
+    # Binned Gaussian KDE: O(n) binning, then smoothing cost independent of n
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=grid_size)
+    width = edges[1] - edges[0]
+    density = np.convolve(counts, _gaussian_kernel(_scott_bandwidth(values, 1), width), mode="same")
+    density = density / max(density.sum() * width, 1e-12)
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def kde_2d(x, y, grid_size=GRID_SIZE):
+    present = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[present], y[present]
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=grid_size)
+    x_width, y_width = x_edges[1] - x_edges[0], y_edges[1] - y_edges[0]
+    density = _smooth(counts, _gaussian_kernel(_scott_bandwidth(x, 2), x_width), axis=0)
+    density = _smooth(density, _gaussian_kernel(_scott_bandwidth(y, 2), y_width), axis=1)
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, density
+
+
+def density_2d(x, y, grid_size=GRID_SIZE):
+    present = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[present], y[present], bins=grid_size)
+    return x_edges, y_edges, counts
+
+
+def regression_line(x, y):
+    present = ~(np.isnan(x) | np.isnan(y))
+    if present.sum() < 2 or np.ptp(x[present]) == 0:
+        return None
+    slope, intercept = np.polyfit(x[present], y[present], 1)
+    xs = np.array([x[present].min(), x[present].max()])
+    return xs, slope * xs + intercept
+
+
+def scatter(ax, x, y, hue=None, threshold=None, cmap='cool', **kwargs):
+    # Point scatter for small data, hexbin density above the threshold
+    if len(x) <= (ROW_THRESHOLD if threshold is None else threshold):
+        sns.scatterplot(x=x, y=y, hue=hue, ax=ax, **kwargs)
+        return
+    if hue is not None:
+        # Colour needs individual points: draw a stratified sample instead, as pairplot does
+        keep = stratified_sample(pd.DataFrame({'hue': np.asarray(hue)}), by='hue').index
+        x, y, hue = (pd.Series(values).iloc[keep] for values in (x, y, hue))
+        sns.scatterplot(x=x, y=y, hue=hue, ax=ax, **kwargs)
+        return
+    hexbin = ax.hexbin(np.asarray(x, dtype=float), np.asarray(y, dtype=float), gridsize=60, mincnt=1,
+                       cmap=cmap, bins='log')
+    ax.figure.colorbar(hexbin, ax=ax, label='Rows (log)')
+
+
+def _panel(df, row, col, kind, diag_kind):
+    y = df[row].to_numpy(dtype=float)
+    if row == col:
+        if diag_kind == 'kde':
+            return kde_1d(y)
+        return np.histogram(y[~np.isnan(y)], bins=40)
+    x = df[col].to_numpy(dtype=float)
+    if kind == 'kde':
+        return kde_2d(x, y)
+    if kind == 'reg':
+        return density_2d(x, y), regression_line(x, y)
+    return density_2d(x, y)
+
+
+def pairplot(df, columns, hue=None, kind='scatter', diag_kind='auto', threshold=None, **kwargs):
+    columns = list(columns)
+    if diag_kind == 'auto':
+        diag_kind = 'kde' if hue is not None else 'hist'
+    if not is_large(df, threshold):
+        return sns.pairplot(df, vars=columns, hue=hue, kind=kind, diag_kind=diag_kind, **kwargs).figure
+    if hue is not None:
+        # Colour needs individual points: draw a stratified sample instead of the full frame
+        sample = stratified_sample(df[columns + [hue] if hue not in columns else columns], by=hue)
+        return sns.pairplot(sample, vars=columns, hue=hue, kind=kind, diag_kind=diag_kind, **kwargs).figure
+
+    cells = [(row, col) for row in columns for col in columns]
+    with ThreadPoolExecutor(PANEL_WORKERS) as pool:
+        panels = dict(zip(cells, pool.map(lambda cell: _panel(df, cell[0], cell[1], kind, diag_kind), cells)))
+
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    for (row, col), panel in panels.items():
+        ax = axes[columns.index(row)][columns.index(col)]
+        if row == col:
+            if diag_kind == 'kde':
+                grid, density = panel
+                ax.fill_between(grid, density, alpha=0.5)
+                ax.plot(grid, density)
+            else:
+                counts, edges = panel
+                ax.stairs(counts, edges, fill=True)
+        elif kind == 'kde':
+            xs, ys, density = panel
+            ax.contourf(xs, ys, density.T, levels=8, cmap='Blues')
+        else:
+            (x_edges, y_edges, counts), line = panel if kind == 'reg' else (panel, None)
+            ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap='Blues')
+            if line is not None:
+                ax.plot(*line, color='crimson')
+        ax.set_xlabel(col if row == columns[-1] else '')
+        ax.set_ylabel(row if col == columns[0] else '')
+    fig.suptitle(f'{len(df):,} rows (binned)', y=1.0)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, dataset_schema, load_model
+
+# Headless batch scoring: stream CSV/Parquet patient extracts through the
+# RandomForest in fixed-size chunks and write results incrementally.
+#
+#   python score.py patients.csv scored.csv --chunk-size 50000
+#   python score.py patients.parquet scored.parquet
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def input_columns(path):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, dtype=None):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtype)
+
+
+def output_schema(input_path, columns, features):
+    # One Arrow schema for every chunk: features and risk as float64, the
+    # prediction as a string, other columns as the input declares them (text for CSV)
+    import pyarrow as pa
+
+    declared = {}
+    if _is_parquet(input_path):
+        import pyarrow.parquet as pq
+
+        declared = {field.name: field.type for field in pq.read_schema(input_path)}
+    fields = []
+    for column in columns:
+        if column in features or column == "risk":
+            fields.append(pa.field(column, pa.float64()))
+        elif column == "prediction":
+            fields.append(pa.field(column, pa.string()))
+        else:
+            fields.append(pa.field(column, declared.get(column, pa.string())))
+    return pa.schema(fields)
+
+
+class ChunkWriter:
+    # Appends scored chunks to a CSV or Parquet file without holding them in memory.
+    # Parquet chunks are cast to `schema`, so type drift between chunks cannot
+    # break the file.
+
+    def __init__(self, path, columns, schema=None):
+        self.path = path
+        self.columns = list(columns)
+        self.schema = schema
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame[self.columns], schema=self.schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, self.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame[self.columns].to_csv(self.path, mode="a" if self._wrote_header else "w",
+                                       header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def score_frame(model, frame, features, keep_features=False):
+    missing = [col for col in features if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {missing}")
+
+    proba = model.predict_proba(frame[features])
+    classes = list(model.classes_)
+
+    passthrough = frame.columns if keep_features else [c for c in frame.columns if c not in features]
+    result = frame[list(passthrough)].copy()
+    result["prediction"] = np.asarray(model.classes_)[proba.argmax(axis=1)]
+    result["risk"] = proba[:, classes.index(POSITIVE_CLASS)]
+    return result
+
+
+def score_file(input_path, output_path, model=None, features=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, keep_features=False):
+    if model is None:
+        model = load_model(MODEL_PATH)
+    if features is None:
+        features, _ = dataset_schema(DATA_PATH)
+
+    columns = input_columns(input_path)
+    missing = [col for col in features if col not in columns]
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {missing}")
+    passthrough = [c for c in columns if keep_features or c not in features]
+    output_columns = passthrough + ["prediction", "risk"]
+    schema = output_schema(input_path, output_columns, features) if _is_parquet(output_path) else None
+    # Non-feature CSV columns are read as text, so their type cannot drift between chunks
+    dtype = {c: str for c in passthrough if c not in features}
+
+    writer = ChunkWriter(output_path, output_columns, schema)
+    rows = 0
+    chunks = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(input_path, chunk_size, dtype):
+            if chunk.empty:
+                continue
+            writer.write(score_frame(model, chunk, features, keep_features))
+            rows += len(chunk)
+            chunks += 1
+        if not chunks:
+            # No rows: still write the header so downstream jobs find the file
+            writer.write(pd.DataFrame(columns=output_columns))
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score patient records with the heart disease model.")
+    parser.add_argument("input", help="CSV or Parquet file with the 13 feature columns")
+    parser.add_argument("output", help="CSV or Parquet file to write predictions to")
+    parser.add_argument("--model", default=MODEL_PATH, help="Path to the pickled model")
+    parser.add_argument("--schema", default=DATA_PATH, help="CSV whose header defines the feature columns")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--keep-features", action="store_true", help="Copy the feature columns to the output")
+    args = parser.parse_args(argv)
+
+    features, _ = dataset_schema(args.schema)
+    report = score_file(args.input, args.output, model=load_model(args.model), features=features,
+                        chunk_size=args.chunk_size, keep_features=args.keep_features)
+    print(f"Scored {report['rows']} rows in {report['chunks']} chunks "
+          f"({report['seconds']:.2f}s, {report['rows_per_sec']:,.0f} rows/sec) -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from resources import POSITIVE_CLASS
+
+# What-if sweeps for the Prediction page: the current input row is repeated
+# once per grid point with one or two features varied, and the whole grid is
+# scored in a single batched predict_proba call instead of one prediction
+# per position. Ranges match the sidebar sliders.
+
+INPUT_RANGES = {
+    'Age': (0, 100, 1),
+    'Sex': (0, 1, 1),
+    'Chest pain type': (1, 4, 1),
+    'BP': (80, 200, 1),
+    'Cholesterol': (100, 400, 1),
+    'FBS over 120': (0, 1, 1),
+    'EKG results': (0, 2, 1),
+    'Max HR': (60, 200, 1),
+    'Exercise angina': (0, 1, 1),
+    'ST depression': (0.0, 6.2, 0.1),
+    'Slope of ST': (1, 3, 1),
+    'Number of vessels fluro': (0, 3, 1),
+    'Thallium': (3, 7, 1),
+}
+MAX_POINTS_2D = 60
+
+
+def grid_values(feature, max_points=None):
+    low, high, step = INPUT_RANGES[feature]
+    values = np.round(np.arange(low, high + step / 2, step), 6)
+    if max_points and len(values) > max_points:
+        # Thin evenly, keeping both ends of the range
+        values = values[np.unique(np.round(np.linspace(0, len(values) - 1, max_points)).astype(int))]
+    return values
+
+
+def _risk(model, rows):
+    start = time.perf_counter()
+    proba = model.predict_proba(rows)
+    seconds = time.perf_counter() - start
+    return proba[:, list(model.classes_).index(POSITIVE_CLASS)], seconds
+
+
+def sweep(model, row, feature, values):
+    # Risk for each value of one feature, other inputs held at `row`
+    rows = pd.DataFrame(np.repeat(row[list(model.feature_names_in_)].to_numpy(dtype=float), len(values), axis=0),
+                        columns=model.feature_names_in_)
+    rows[feature] = values
+    return _risk(model, rows)
+
+
+def sweep_2d(model, row, x_feature, x_values, y_feature, y_values):
+    # Risk over the x_values by y_values grid, as a (len(y_values), len(x_values)) array
+    xx, yy = np.meshgrid(x_values, y_values)
+    rows = pd.DataFrame(np.repeat(row[list(model.feature_names_in_)].to_numpy(dtype=float), xx.size, axis=0),
+                        columns=model.feature_names_in_)
+    rows[x_feature] = xx.ravel()
+    rows[y_feature] = yy.ravel()
+    risk, seconds = _risk(model, rows)
+    return risk.reshape(xx.shape), seconds
+
+
+def what_if_section(model, input_df):
+    import altair as alt
+
+    features = list(model.feature_names_in_)
+    mode = st.radio("Vary", ["One feature", "Two features"], horizontal=True)
+    current = input_df.iloc[0]
+
+    if mode == "One feature":
+        feature = st.selectbox("Feature to vary", features, index=features.index('Cholesterol'))
+        values = grid_values(feature)
+        risk, seconds = sweep(model, input_df, feature, values)
+        curve = pd.DataFrame({feature: values, "Risk": risk})
+        line = alt.Chart(curve).mark_line().encode(x=alt.X(feature, type="quantitative"), y=alt.Y("Risk", scale=alt.Scale(domain=[0, 1])))
+        marker = alt.Chart(pd.DataFrame({feature: [current[feature]]})).mark_rule(color="crimson").encode(x=alt.X(feature, type="quantitative"))
+        st.altair_chart(line + marker, width="stretch")
+        points = len(values)
+    else:
+        x_feature = st.selectbox("X-axis feature", features, index=features.index('Cholesterol'))
+        y_options = [f for f in features if f != x_feature]
+        y_feature = st.selectbox("Y-axis feature", y_options, index=y_options.index('Age') if 'Age' in y_options else 0)
+        x_values = grid_values(x_feature, MAX_POINTS_2D)
+        y_values = grid_values(y_feature, MAX_POINTS_2D)
+        risk, seconds = sweep_2d(model, input_df, x_feature, x_values, y_feature, y_values)
+        xx, yy = np.meshgrid(x_values, y_values)
+        cells = pd.DataFrame({x_feature: xx.ravel(), y_feature: yy.ravel(), "Risk": risk.ravel()})
+        heatmap = alt.Chart(cells).mark_rect().encode(
+            x=alt.X(x_feature, type="ordinal", axis=alt.Axis(labelOverlap=True)),
+            y=alt.Y(y_feature, type="ordinal", sort="descending", axis=alt.Axis(labelOverlap=True)),
+            color=alt.Color("Risk", type="quantitative", scale=alt.Scale(scheme="redyellowgreen", reverse=True, domain=[0, 1])),
+            tooltip=[x_feature, y_feature, alt.Tooltip("Risk", format=".2f")],
+        )
+        st.altair_chart(heatmap, width="stretch")
+        points = risk.size
+
+    st.caption(f"Scored {points:,} grid rows in one batch in {seconds * 1000:.1f} ms.")
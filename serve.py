@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import collections
+import math
+import multiprocessing
+import time
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from assets import static_files
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, dataset_schema, file_fingerprint, load_predictor
+from shared_model import export_model, is_current, shared_path
+
+# JSON/HTTP inference service. Concurrent single-patient requests are
+# coalesced into micro-batches (bounded by max batch size and max wait)
+# before a single predict_proba call, amortizing sklearn's per-call overhead.
+#
+#   python serve.py --port 8080 --max-batch-size 32 --max-wait-ms 5
+#   curl -X POST localhost:8080/predict -d '{"Age": 54, "Sex": 1, ...}'
+#
+# It also serves the image variants built by assets.py at /assets/<name>:
+# names are content hashes, so responses are cacheable forever.
+#
+# --workers N runs N processes on the same port (SO_REUSEPORT). The model is
+# exported once to memory-mapped arrays (see shared_model.py) that every
+# worker attaches to read-only, so workers start in milliseconds and share one
+# copy of the forest.
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+class MicroBatcher:
+    def __init__(self, model, features, max_batch_size=32, max_wait_ms=5.0, window=10_000):
+        self.model = model
+        self.features = features
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._task = None
+
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.latencies = collections.deque(maxlen=window)
+        self.batch_sizes = collections.deque(maxlen=window)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            X = pd.DataFrame([row for row, _, _ in batch], columns=self.features)
+            try:
+                # predict_proba releases the event loop so new requests keep queueing
+                proba = await loop.run_in_executor(None, self.model.predict_proba, X)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            now = time.perf_counter()
+            self.batches += 1
+            self.batch_sizes.append(len(batch))
+            for (_, future, enqueued), row_proba in zip(batch, proba):
+                self.requests += 1
+                self.latencies.append(now - enqueued)
+                if not future.done():
+                    future.set_result(row_proba)
+
+    def metrics(self):
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+            "latency_p50_ms": percentile(latencies_ms, 50),
+            "latency_p99_ms": percentile(latencies_ms, 99),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+def _parse_row(payload, features):
+    if not isinstance(payload, dict):
+        raise web.HTTPBadRequest(text="Expected a JSON object with one patient's features")
+    missing = [name for name in features if name not in payload]
+    if missing:
+        raise web.HTTPBadRequest(text=f"Missing features: {missing}")
+    try:
+        row = [float(payload[name]) for name in features]
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text="Feature values must be numeric")
+    # json accepts NaN and Infinity; one such row would fail its whole batch
+    non_finite = [name for name, value in zip(features, row) if not math.isfinite(value)]
+    if non_finite:
+        raise web.HTTPBadRequest(text=f"Feature values must be finite: {non_finite}")
+    return row
+
+
+async def predict(request):
+    batcher = request.app["batcher"]
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body is not valid JSON")
+
+    proba = await batcher.submit(_parse_row(payload, batcher.features))
+    classes = list(batcher.model.classes_)
+    return web.json_response({
+        "prediction": classes[int(np.argmax(proba))],
+        "risk": float(proba[classes.index(POSITIVE_CLASS)]),
+    })
+
+
+async def metrics(request):
+    return web.json_response(request.app["batcher"].metrics())
+
+
+async def asset(request):
+    entry = request.app["assets"].get(request.match_info["name"])
+    if entry is None:
+        raise web.HTTPNotFound()
+    data, mime_type = entry
+    return web.Response(body=data, content_type=mime_type, headers={"Cache-Control": IMMUTABLE})
+
+
+async def health(request):
+    return web.json_response({"status": "ok"})
+
+
+def create_app(model_path=MODEL_PATH, schema_path=DATA_PATH, max_batch_size=32, max_wait_ms=5.0):
+    features, _ = dataset_schema(schema_path)
+    batcher = MicroBatcher(load_predictor(model_path), features, max_batch_size, max_wait_ms)
+
+    async def on_startup(app):
+        await batcher.start()
+
+    async def on_cleanup(app):
+        await batcher.stop()
+
+    app = web.Application()
+    app["batcher"] = batcher
+    # Held in memory: a handful of small, pre-encoded files
+    app["assets"] = static_files()
+    app.router.add_post("/predict", predict)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/assets/{name}", asset)
+    app.router.add_get("/health", health)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the heart disease model over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--schema", default=DATA_PATH)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1, help="Server processes sharing the port and the model")
+    args = parser.parse_args(argv)
+
+    if args.workers == 1:
+        _serve(args)
+        return
+    if not is_current(shared_path(args.model), file_fingerprint(args.model)):
+        export_model(args.model)
+    workers = [multiprocessing.Process(target=_serve, args=(args,), name=f"worker-{i}") for i in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def _serve(args):
+    app = create_app(args.model, args.schema, args.max_batch_size, args.max_wait_ms)
+    web.run_app(app, host=args.host, port=args.port, reuse_port=args.workers > 1)
+
+
+if __name__ == "__main__":
+    main()
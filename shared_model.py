@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from flat_forest import ARRAYS
+
+# Read-only export of the served model for multi-process hosting: the flat
+# forest's node arrays (plus the derived child/leaf arrays the evaluator would
+# otherwise recompute) and the TreeExplainer's path groups and outcome tables,
+# one .npy file each, with a model.json holding the classes, feature names and
+# the source model's fingerprint. Worker processes memory-map the files, so
+# they share one copy in the page cache instead of each unpickling the forest
+# and rebuilding the explainer: attaching reads a few headers, imports no
+# sklearn, and adds almost nothing to a worker's own memory. Only tree
+# ensembles are exported; for any other model export_model() returns None
+# and workers unpickle it as before.
+#
+#   python shared_model.py RF_heart_disease_model.pkl
+
+META_FILE = "model.json"
+DERIVED = ("children", "is_leaf")
+GROUP_ARRAYS = ("feature", "lower", "upper", "zero", "value", "table")
+
+
+def shared_path(model_path):
+    return os.path.splitext(model_path)[0] + ".shared"
+
+
+def _save(directory, name, array):
+    np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+
+def export_model(model_path, out_path=None, fingerprint=None):
+    from flat_forest import FlatForest, as_predictor
+    from resources import file_fingerprint, read_model
+
+    out_path = out_path or shared_path(model_path)
+    model = read_model(model_path)
+    forest = as_predictor(model)
+    if not isinstance(forest, FlatForest):
+        # Nothing to share; an export left from an earlier forest is stale, so drop it
+        shutil.rmtree(out_path, ignore_errors=True)
+        return None
+
+    tmp_path = f"{out_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        _write_export(tmp_path, model, forest, model_path, fingerprint or file_fingerprint(model_path))
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    shutil.rmtree(out_path, ignore_errors=True)
+    os.replace(tmp_path, out_path)
+    return read_meta(out_path)
+
+
+def _write_export(tmp_path, model, forest, model_path, fingerprint):
+    from flat_forest import is_tree_ensemble
+
+    for name in ARRAYS:
+        _save(tmp_path, name, getattr(forest, name))
+    _save(tmp_path, "children", forest._children)
+    _save(tmp_path, "is_leaf", forest._is_leaf)
+    meta = {
+        "source": os.path.basename(model_path),
+        "source_fingerprint": fingerprint,
+        "classes": forest.classes_.astype(str).tolist(),
+        "feature_names": forest.feature_names_in_.astype(str).tolist(),
+        "max_depth": int(forest.max_depth),
+        "scale": forest.scale.tolist() if hasattr(forest, "scale") else None,
+        "explainer": None,
+    }
+
+    # The explainer needs the sklearn trees' node covers; compacted forests have none
+    if is_tree_ensemble(model):
+        from explain import TreeExplainer
+
+        explainer = TreeExplainer.from_model(model)
+        for depth, group in explainer.groups.items():
+            for name, array in zip(GROUP_ARRAYS, group):
+                if array is not None:
+                    _save(tmp_path, f"explain_{depth}_{name}", array)
+        meta["explainer"] = {
+            "expected_value": explainer.expected_value,
+            "depths": sorted(int(depth) for depth in explainer.groups),
+            "tables": sorted(int(depth) for depth, group in explainer.groups.items() if group[-1] is not None),
+        }
+
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def is_current(path, fingerprint):
+    # An export is used only while it was made from the model file as it is now (and by this
+    # version of the evaluator: exports that predate one of its arrays are stale too)
+    return (os.path.isdir(path) and read_meta(path)["source_fingerprint"] == fingerprint
+            and all(os.path.exists(os.path.join(path, f"{name}.npy")) for name in ARRAYS + DERIVED))
+
+
+def _attach(path, name):
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+
+def attach_model(path):
+    from compact import CompactForest
+    from flat_forest import FlatForest
+
+    meta = read_meta(path)
+    arrays = {name: _attach(path, name) for name in ARRAYS + DERIVED}
+    kwargs = {
+        "classes": np.asarray(meta["classes"], dtype=object),
+        "feature_names": np.asarray(meta["feature_names"], dtype=object),
+        "max_depth": meta["max_depth"],
+        **arrays,
+    }
+    if meta["scale"] is not None:
+        return CompactForest(scale=meta["scale"], **kwargs)
+    return FlatForest(**kwargs)
+
+
+def attach_explainer(path):
+    meta = read_meta(path)
+    if meta["explainer"] is None:
+        return None
+    from explain import TreeExplainer
+
+    groups = {}
+    for depth in meta["explainer"]["depths"]:
+        groups[depth] = tuple(_attach(path, f"explain_{depth}_{name}") for name in GROUP_ARRAYS[:-1])
+        # Paths too deep for an outcome table are explained row by row
+        groups[depth] += (_attach(path, f"explain_{depth}_table") if depth in meta["explainer"]["tables"] else None,)
+    return TreeExplainer(groups, meta["explainer"]["expected_value"], meta["feature_names"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the model as memory-mapped arrays for worker processes to share.")
+    parser.add_argument("model", nargs="?", default="RF_heart_disease_model.pkl")
+    parser.add_argument("--out", help="Output directory (default: <model name>.shared)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    meta = export_model(args.model, args.out)
+    if meta is None:
+        print(f"{args.model} is not a tree ensemble; nothing exported (workers unpickle it)", file=sys.stderr)
+        return 1
+    out_path = args.out or shared_path(args.model)
+    size = sum(os.path.getsize(os.path.join(out_path, name)) for name in os.listdir(out_path))
+    print(f"Exported {args.model} ({'with' if meta['explainer'] else 'without'} explainer, {size / 1e6:.2f} MB) "
+          f"to {out_path} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
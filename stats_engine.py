@@ -0,0 +1,347 @@
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Single-pass, chunked summary statistics. Everything the Analyze and
+# Insights pages show (describe tables, null counts, mean/median/mode and
+# the correlation matrix) is accumulated chunk by chunk into mergeable state,
+# so multi-million-row registries never need to sit in memory, appended rows
+# only cost a pass over the new tail, and the state can be saved next to
+# the data for pages to read (or under STATS_CACHE_DIR when the data's
+# directory is read-only).
+
+CHUNK_ROWS = 100_000
+STATS_CACHE_DIR = os.environ.get("HEART_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "heart-app"))
+
+
+class QuantileSketch:
+    # Exact weighted value counts while the column has at most `max_bins`
+    # distinct values (true for every column of the heart dataset); beyond
+    # that, adjacent values are merged into equal-weight centroids.
+
+    def __init__(self, max_bins=512):
+        self.max_bins = max_bins
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.exact = True
+
+    def update(self, values):
+        if not len(values):
+            return
+        chunk_values, chunk_counts = np.unique(values, return_counts=True)
+        merged, inverse = np.unique(np.concatenate([self.values, chunk_values]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, chunk_counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.values = merged
+        if len(self.values) > self.max_bins:
+            self._compress()
+
+    def _compress(self):
+        cumulative = np.cumsum(self.counts)
+        edges = np.linspace(0, cumulative[-1], self.max_bins + 1)[1:-1]
+        groups = np.searchsorted(edges, cumulative - self.counts, side="right")
+        counts = np.bincount(groups, weights=self.counts)
+        sums = np.bincount(groups, weights=self.values * self.counts)
+        keep = counts > 0
+        self.values = sums[keep] / counts[keep]
+        self.counts = counts[keep].astype(np.int64)
+        self.exact = False
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        # Same linear interpolation as pandas.Series.quantile over the expanded values
+        if not self.total:
+            return np.nan
+        position = (self.total - 1) * q
+        cumulative = np.cumsum(self.counts)
+        lower = self.values[np.searchsorted(cumulative, np.floor(position), side="right")]
+        upper = self.values[np.searchsorted(cumulative, np.ceil(position), side="right")]
+        return float(lower + (upper - lower) * (position - np.floor(position)))
+
+
+class HeavyHitters:
+    # Misra-Gries frequent-items summary: exact counts until more than `size`
+    # distinct values are seen, then a bounded-error estimate of the mode.
+
+    def __init__(self, size=256):
+        self.size = size
+        self.counts = {}
+        self.exact = True
+
+    def update(self, values):
+        for value, count in pd.Series(values).value_counts().items():
+            # Categorical columns also report unseen categories with a zero count
+            if count:
+                self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.size:
+            ordered = sorted(self.counts.values(), reverse=True)
+            floor = ordered[self.size]
+            self.counts = {v: c - floor for v, c in self.counts.items() if c > floor}
+            self.exact = False
+
+    def top(self):
+        if not self.counts:
+            return None, 0
+        best = max(self.counts.values())
+        # pandas.Series.mode()[0] is the smallest of the tied values
+        return min(v for v, c in self.counts.items() if c == best), best
+
+
+class StreamingStats:
+    def __init__(self, max_bins=512, heavy_hitters=256):
+        self.max_bins = max_bins
+        self.heavy_hitters = heavy_hitters
+        self.columns = None
+        self.numeric_columns = None
+        self.integer_columns = None
+        self.rows = 0
+        self.nulls = None
+        self.minimum = None
+        self.maximum = None
+        self.sketches = None
+        self.frequent = None
+        # Pairwise-complete co-moments, shifted by the first chunk's means for stability
+        self.shift = None
+        self.pair_n = None
+        self.pair_sum = None
+        self.pair_sumsq = None
+        self.pair_cross = None
+        # Where the last pass over the source file stopped, for incremental appends
+        self.source_bytes = 0
+        self.source_prefix_digest = None
+
+    def _initialise(self, chunk):
+        self.columns = list(chunk.columns)
+        numeric = chunk.select_dtypes(include=["number"])
+        self.numeric_columns = list(numeric.columns)
+        self.integer_columns = [c for c in numeric.columns if pd.api.types.is_integer_dtype(numeric[c])]
+        p = len(self.numeric_columns)
+        self.nulls = {c: 0 for c in self.columns}
+        self.minimum = np.full(p, np.inf)
+        self.maximum = np.full(p, -np.inf)
+        self.sketches = {c: QuantileSketch(self.max_bins) for c in self.numeric_columns}
+        self.frequent = {c: HeavyHitters(self.heavy_hitters) for c in self.columns}
+        self.shift = np.nan_to_num(numeric.mean().to_numpy(dtype=np.float64))
+        self.pair_n = np.zeros((p, p))
+        self.pair_sum = np.zeros((p, p))
+        self.pair_sumsq = np.zeros((p, p))
+        self.pair_cross = np.zeros((p, p))
+
+    def update(self, chunk):
+        if self.columns is None:
+            self._initialise(chunk)
+        self.rows += len(chunk)
+        # A column stays integer only while every chunk parses as integers
+        self.integer_columns = [c for c in self.integer_columns if pd.api.types.is_integer_dtype(chunk[c])]
+
+        for column, count in chunk[self.columns].isna().sum().items():
+            self.nulls[column] += int(count)
+        for column in self.columns:
+            values = chunk[column].dropna()
+            self.frequent[column].update(values)
+            if column in self.sketches:
+                self.sketches[column].update(values.to_numpy(dtype=np.float64))
+
+        X = chunk[self.numeric_columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(X)
+        self.minimum = np.minimum(self.minimum, np.where(present, X, np.inf).min(axis=0, initial=np.inf))
+        self.maximum = np.maximum(self.maximum, np.where(present, X, -np.inf).max(axis=0, initial=-np.inf))
+
+        M = present.astype(np.float64)
+        Z = np.where(present, X - self.shift, 0.0)
+        self.pair_n += M.T @ M
+        self.pair_sum += Z.T @ M
+        self.pair_sumsq += (Z * Z).T @ M
+        self.pair_cross += Z.T @ Z
+        return self
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=CHUNK_ROWS, **kwargs):
+        stats = cls(**kwargs)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            stats.update(df.iloc[start:start + chunk_rows])
+        return stats
+
+    @classmethod
+    def from_csv(cls, path, chunk_rows=CHUNK_ROWS, **kwargs):
+        stats = cls(**kwargs)
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            stats.update(chunk)
+        stats._mark_source(path)
+        return stats
+
+    def _mark_source(self, path):
+        self.source_bytes = os.path.getsize(path)
+        self.source_prefix_digest = prefix_digest(path, self.source_bytes)
+
+    def refresh_from_csv(self, path, chunk_rows=CHUNK_ROWS):
+        # Fold in rows appended to `path` since the last pass. Returns None when
+        # the already-counted part of the file changed and a full pass is needed.
+        size = os.path.getsize(path)
+        if not self.source_bytes or size < self.source_bytes or prefix_digest(path, self.source_bytes) != self.source_prefix_digest:
+            return None
+        with open(path, "rb") as f:
+            f.seek(self.source_bytes - 1)
+            if f.read(1) != b"\n" and f.read(1) not in (b"", b"\n", b"\r"):
+                # The last counted line had no newline and the append continued it
+                return None
+            if size > self.source_bytes:
+                for chunk in pd.read_csv(f, header=None, names=self.columns, chunksize=chunk_rows):
+                    self.update(chunk)
+        self._mark_source(path)
+        return self
+
+    # Results
+
+    def count(self):
+        return pd.Series({c: self.rows - self.nulls[c] for c in self.columns})
+
+    def null_counts(self):
+        return pd.Series(self.nulls, index=self.columns, dtype="int64")
+
+    def mean(self, column):
+        i = self.numeric_columns.index(column)
+        n = self.pair_n[i, i]
+        return self.shift[i] + self.pair_sum[i, i] / n if n else np.nan
+
+    def std(self, column):
+        i = self.numeric_columns.index(column)
+        n = self.pair_n[i, i]
+        if n < 2:
+            return np.nan
+        variance = (self.pair_sumsq[i, i] - self.pair_sum[i, i] ** 2 / n) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def quantile(self, column, q):
+        return self.sketches[column].quantile(q)
+
+    def median(self, column):
+        return self.quantile(column, 0.5)
+
+    def mode(self, column):
+        sketch = self.sketches.get(column)
+        if sketch is not None and sketch.exact and sketch.total:
+            best = sketch.counts.max()
+            value = sketch.values[np.flatnonzero(sketch.counts == best)[0]]
+        else:
+            value, _ = self.frequent[column].top()
+        if column in (self.integer_columns or []) and value is not None:
+            return int(value)
+        return value
+
+    def corr(self):
+        n = self.pair_n
+        sx, sy = self.pair_sum, self.pair_sum.T
+        sxx, syy = self.pair_sumsq, self.pair_sumsq.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            numerator = n * self.pair_cross - sx * sy
+            denominator = np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+            corr = np.clip(numerator / denominator, -1.0, 1.0)
+        corr[n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.numeric_columns, columns=self.numeric_columns)
+
+    def describe(self):
+        # Mirrors DataFrame.describe() for the numeric columns
+        rows = {}
+        for column in self.numeric_columns:
+            i = self.numeric_columns.index(column)
+            rows[column] = {
+                "count": float(self.rows - self.nulls[column]),
+                "mean": self.mean(column),
+                "std": self.std(column),
+                "min": self.minimum[i] if np.isfinite(self.minimum[i]) else np.nan,
+                "25%": self.quantile(column, 0.25),
+                "50%": self.quantile(column, 0.5),
+                "75%": self.quantile(column, 0.75),
+                "max": self.maximum[i] if np.isfinite(self.maximum[i]) else np.nan,
+            }
+        return pd.DataFrame(rows)
+
+    def describe_all(self):
+        # Mirrors DataFrame.describe(include='all'): unique/top/freq for non-numeric columns
+        numeric = self.describe()
+        index = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        table = pd.DataFrame(np.nan, index=index, columns=self.columns, dtype=object)
+        for column in self.columns:
+            if column in self.numeric_columns:
+                for stat, value in numeric[column].items():
+                    table.loc[stat, column] = value
+            else:
+                frequent = self.frequent[column]
+                top, freq = frequent.top()
+                table.loc["count", column] = self.rows - self.nulls[column]
+                table.loc["unique", column] = len(frequent.counts) if frequent.exact else np.nan
+                table.loc["top", column] = top
+                table.loc["freq", column] = freq
+        return table
+
+    # Persistence
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        try:
+            joblib.dump(self, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def prefix_digest(path, n_bytes, chunk_size=1 << 20):
+    # SHA-256 of the file's first n_bytes: tells an append (same prefix) from a rewrite
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = n_bytes
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def stats_path(data_path):
+    return f"{data_path}.stats.joblib"
+
+
+def cached_stats_path(data_path):
+    # Fallback location, keyed by the data's absolute path so same-named datasets don't collide
+    key = hashlib.sha256(os.path.abspath(data_path).encode()).hexdigest()[:16]
+    return os.path.join(STATS_CACHE_DIR, f"{os.path.basename(data_path)}-{key}.stats.joblib")
+
+
+def _save_stats(stats, data_path):
+    # Next to the data if its directory is writable, else in the cache dir, else not at all
+    for state_path in (stats_path(data_path), cached_stats_path(data_path)):
+        try:
+            os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+            stats.save(state_path)
+            return state_path
+        except OSError:
+            continue
+    return None
+
+
+def load_or_build_stats(data_path):
+    # Persisted state next to the data (or in the cache dir); appended rows are folded in incrementally
+    for state_path in (stats_path(data_path), cached_stats_path(data_path)):
+        if os.path.exists(state_path):
+            stats = StreamingStats.load(state_path)
+            if stats.refresh_from_csv(data_path) is not None:
+                _save_stats(stats, data_path)
+                return stats
+    stats = StreamingStats.from_csv(data_path)
+    _save_stats(stats, data_path)
+    return stats
@@ -0,0 +1,238 @@
+import argparse
+import io
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from resources import DATA_PATH, MODEL_PATH, POSITIVE_CLASS, file_fingerprint
+
+# Reproducible training, replacing the hand-run notebook: cross-validated
+# grid search over random forest, gradient boosting and logistic regression,
+# with every (candidate, fold) fit running in a process pool across all cores.
+# The best setting of each family is refit on the training split, scored on
+# a held-out test split, and timed for fit, single-row and batch prediction
+# latency and pickled size. The overall winner (by CV accuracy) is written
+# as a versioned artifact next to a JSON report; --promote atomically
+# replaces the model the app serves.
+#
+#   python train.py
+#   python train.py --folds 5 --jobs 8 --promote
+
+ARTIFACT_DIR = "artifacts"
+TEST_SIZE = 0.2
+SEED = 128
+LATENCY_REPEATS = 200
+BATCH_ROWS = 1_000
+
+CANDIDATES = {
+    "random_forest": (
+        lambda: RandomForestClassifier(random_state=SEED),
+        {"n_estimators": [50, 100, 200], "max_depth": [None, 6, 10], "min_samples_leaf": [1, 3]},
+    ),
+    "gradient_boosting": (
+        lambda: GradientBoostingClassifier(random_state=SEED),
+        {"n_estimators": [50, 100, 200], "learning_rate": [0.05, 0.1], "max_depth": [2, 3]},
+    ),
+    "logistic_regression": (
+        lambda: make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+        {"logisticregression__C": [0.01, 0.1, 1.0, 10.0]},
+    ),
+}
+
+
+def build(family, params):
+    return clone(CANDIDATES[family][0]()).set_params(**params)
+
+
+def param_grid(family):
+    grid = CANDIDATES[family][1]
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+# Data a pool's workers share, sent once per worker through the pool
+# initializer rather than pickled into every (candidate, fold) task
+_shared = {}
+
+
+def _init_worker(shared):
+    _shared.clear()
+    _shared.update(shared)
+
+
+def _fit_fold(task):
+    # Runs in a worker process: fit one candidate on one CV fold
+    family, params, fold = task
+    X, y = _shared["X"], _shared["y"]
+    train_index, test_index = _shared["splits"][fold]
+    model = build(family, params)
+    start = time.perf_counter()
+    model.fit(X.iloc[train_index], y.iloc[train_index])
+    fit_seconds = time.perf_counter() - start
+    accuracy = accuracy_score(y.iloc[test_index], model.predict(X.iloc[test_index]))
+    return family, params, accuracy, fit_seconds
+
+
+def cross_validate(X, y, families, folds, jobs):
+    splits = list(StratifiedKFold(folds, shuffle=True, random_state=SEED).split(X, y))
+    tasks = [
+        (family, params, fold)
+        for family in families
+        for params in param_grid(family)
+        for fold in range(len(splits))
+    ]
+    scores = {}
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=({"X": X, "y": y, "splits": splits},)) as pool:
+        for family, params, accuracy, fit_seconds in pool.map(_fit_fold, tasks, chunksize=max(1, len(tasks) // (4 * jobs))):
+            entry = scores.setdefault((family, json.dumps(params, sort_keys=True)), {"accuracy": [], "fit_seconds": []})
+            entry["accuracy"].append(accuracy)
+            entry["fit_seconds"].append(fit_seconds)
+
+    results = []
+    for (family, params), entry in scores.items():
+        results.append({
+            "family": family,
+            "params": json.loads(params),
+            "cv_accuracy": float(np.mean(entry["accuracy"])),
+            "cv_accuracy_std": float(np.std(entry["accuracy"])),
+            "cv_fit_seconds": float(np.mean(entry["fit_seconds"])),
+        })
+    return sorted(results, key=lambda r: (r["family"], -r["cv_accuracy"], r["cv_fit_seconds"]))
+
+
+def _median_seconds(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def _pickled_bytes(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+
+def _refit(task):
+    # Runs in a worker process: refit the best setting on the full training split and measure it
+    family, params = task
+    X_train, y_train, X_test, y_test = (_shared[name] for name in ("X_train", "y_train", "X_test", "y_test"))
+    model = build(family, params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    positive = list(model.classes_).index(POSITIVE_CLASS)
+    proba = model.predict_proba(X_test)[:, positive]
+    row = X_test.iloc[[0]]
+    batch = X_test.sample(BATCH_ROWS, replace=True, random_state=SEED)
+    batch_seconds = _median_seconds(lambda: model.predict_proba(batch), max(5, LATENCY_REPEATS // 20))
+    metrics = {
+        "family": family,
+        "params": params,
+        "fit_seconds": fit_seconds,
+        "test_accuracy": float(accuracy_score(y_test, model.predict(X_test))),
+        "test_roc_auc": float(roc_auc_score(y_test == POSITIVE_CLASS, proba)),
+        "latency_row_ms": _median_seconds(lambda: model.predict_proba(row), LATENCY_REPEATS) * 1000,
+        "latency_batch_ms": batch_seconds * 1000,
+        "latency_batch_per_row_us": batch_seconds / BATCH_ROWS * 1e6,
+        "model_bytes": _pickled_bytes(model),
+    }
+    return model, metrics
+
+
+def train(data_path=DATA_PATH, families=None, folds=5, jobs=None, out_dir=ARTIFACT_DIR):
+    jobs = jobs or os.cpu_count() or 1
+    families = list(families or CANDIDATES)
+    df = pd.read_csv(data_path)
+    X, y = df.iloc[:, :-1], df.iloc[:, -1]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SEED, stratify=y)
+
+    start = time.perf_counter()
+    search = cross_validate(X_train, y_train, families, folds, jobs)
+    search_seconds = time.perf_counter() - start
+
+    best = {}
+    for result in search:
+        best.setdefault(result["family"], result)
+    tasks = [(family, best[family]["params"]) for family in families]
+    shared = {"X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test}
+    with ProcessPoolExecutor(min(jobs, len(tasks)), initializer=_init_worker, initargs=(shared,)) as pool:
+        refits = list(pool.map(_refit, tasks))
+    for _, metrics in refits:
+        metrics["cv_accuracy"] = best[metrics["family"]]["cv_accuracy"]
+
+    # Winner by CV accuracy (the test split stays an unbiased estimate), ties to the faster model
+    model, winner = max(refits, key=lambda refit: (refit[1]["cv_accuracy"], -refit[1]["latency_row_ms"]))
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    os.makedirs(out_dir, exist_ok=True)
+    artifact = os.path.join(out_dir, f"heart_model-{version}-{winner['family']}.pkl")
+    joblib.dump(model, artifact)
+    report = {
+        "version": version,
+        "artifact": artifact,
+        "winner": winner,
+        "data": {"path": data_path, "fingerprint": file_fingerprint(data_path), "rows": len(df),
+                 "train_rows": len(X_train), "test_rows": len(X_test)},
+        "environment": {"python": sys.version.split()[0], "sklearn": sklearn.__version__, "jobs": jobs},
+        "folds": folds,
+        "search_seconds": search_seconds,
+        "candidates": [metrics for _, metrics in refits],
+        "search": search,
+    }
+    with open(os.path.splitext(artifact)[0] + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def promote(artifact, model_path=MODEL_PATH):
+    # Copy then rename, so the app never sees a half-written model file
+    tmp_path = f"{model_path}.tmp"
+    shutil.copyfile(artifact, tmp_path)
+    os.replace(tmp_path, model_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train, compare and version the heart disease models.")
+    parser.add_argument("--data", default=DATA_PATH, help="Training CSV (features, then the label column)")
+    parser.add_argument("--families", nargs="+", choices=list(CANDIDATES), help="Model families to search (default: all)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--out", default=ARTIFACT_DIR, help="Directory for versioned artifacts and reports")
+    parser.add_argument("--promote", action="store_true", help=f"Replace {MODEL_PATH} with the winning model")
+    args = parser.parse_args(argv)
+
+    report = train(args.data, args.families, args.folds, args.jobs, args.out)
+    for metrics in report["candidates"]:
+        print(f"{metrics['family']:<20} cv {metrics['cv_accuracy']:.3f}  test {metrics['test_accuracy']:.3f}  "
+              f"auc {metrics['test_roc_auc']:.3f}  fit {metrics['fit_seconds']:.2f}s  "
+              f"row {metrics['latency_row_ms']:.2f}ms  batch {metrics['latency_batch_per_row_us']:.1f}us/row  "
+              f"{metrics['model_bytes'] / 1024:,.0f} KiB", file=sys.stderr)
+    print(f"Wrote {report['artifact']} ({report['winner']['family']})", file=sys.stderr)
+    if args.promote:
+        promote(report["artifact"])
+        print(f"Promoted to {MODEL_PATH}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())